@@ -0,0 +1,285 @@
+"""
+bone_info_save.py、json_trim.py、bone_viewer.py のベンチマーク
+
+合成したシーン (stub の bpy) とフレームJSONを使い、ボーン数と頂点グループの頂点数ごとに
+save_frame_data_core、extract_bone_data、_draw_bones_from_files の処理速度 (フレーム/秒) と
+最大メモリ使用量を計測する。--output で結果を保存し、次回 --baseline に指定すると性能の低下を検出できる。
+
+python benchmarks/run_benchmarks.py --bones 60 240 --group_size 200 2000 --frames 10 --output result.json
+"""
+import argparse
+import contextlib
+import gc
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# stub の bpy / mathutils / bpy_extras と、リポジトリのスクリプトを読み込めるようにする
+_benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_benchmark_dir, "stub"))
+sys.path.insert(0, os.path.dirname(_benchmark_dir))
+
+import synthetic_frames
+import synthetic_scene
+import bone_info_save
+import bone_viewer
+import frame_store
+import json_trim
+
+# 計測対象 (--targets で指定する名前 → 計測する関数)
+TARGETS = {
+    "save": "bone_info_save.save_frame_data_core",
+    "trim": "json_trim.extract_bone_data",
+    "draw": "bone_viewer._draw_bones_from_files",
+}
+
+
+def prepare_save(work_dir, bone_count, group_size, frame_count, output_format="json"):
+    """
+    save_frame_data_core で全フレームを保存する処理を準備する
+
+    Returns:
+        callable: 1回分の処理 (キャッシュを消した状態から全フレームを保存する)
+    """
+    scene = synthetic_scene.build_scene(bone_count=bone_count, group_size=group_size, frame_count=frame_count)
+    output_dir = os.path.join(work_dir, "save")
+
+    def run():
+        _reset_exporter(scene, output_dir, output_format)
+        for frame in range(scene.frame_start, scene.frame_end + 1, scene.frame_step):
+            bone_info_save.save_frame_data_core(scene, frame)
+        if bone_info_save.animation_writer is not None:
+            bone_info_save.animation_writer.close()
+            bone_info_save.animation_writer = None
+
+    return run
+
+
+def _reset_exporter(scene, output_dir, output_format):
+    """bone_info_save.py の状態を main を実行した直後と同じにする (キャッシュも消す)"""
+    for name, value in list(vars(bone_info_save).items()):
+        if name.endswith("_cache") and isinstance(value, dict):
+            value.clear()
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+
+    bone_info_save.json_output_folder = output_dir
+    bone_info_save.output_format = output_format
+    bone_info_save.frame_rig = None
+    bone_info_save.previous_frame = None
+    bone_info_save.saved_frame_files.clear()
+    bone_info_save.duplicate_frames.clear()
+    if output_format in ("npz", "jsonl"):
+        container_path = os.path.join(output_dir, f"animation.{output_format}")
+        fps = scene.render.fps / scene.render.fps_base
+        if output_format == "npz":
+            bone_info_save.animation_writer = frame_store.AnimationContainerWriter(container_path, fps)
+        else:
+            bone_info_save.animation_writer = frame_store.JsonLinesWriter(
+                container_path, fps, split_rig=bone_info_save.split_rig)
+
+
+def prepare_trim(work_dir, bone_count, group_size, frame_count):
+    """
+    extract_bone_data で全フレームのボーン名を変換し、不要なキーを削除する処理を準備する
+
+    Returns:
+        callable: 1回分の処理
+    """
+    input_paths = _write_input_frames(work_dir, bone_count, group_size, frame_count)
+    csv_path = os.path.join(work_dir, "bone_name.csv")
+    synthetic_frames.write_bone_name_csv(csv_path, bone_count)
+    exclude_keys = json_trim.load_exclude_keys(os.path.join(os.path.dirname(_benchmark_dir), "exclude_keys.txt"))
+    output_dir = os.path.join(work_dir, "trim")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run():
+        for input_path in input_paths:
+            output_path = os.path.join(output_dir, os.path.basename(input_path))
+            json_trim.extract_bone_data(input_path, output_path, csv_path, exclude_keys)
+
+    return run
+
+
+def prepare_draw(work_dir, bone_count, group_size, frame_count):
+    """
+    _draw_bones_from_files で全フレームを描画してPNGとして保存する処理を準備する
+
+    Returns:
+        callable: 1回分の処理
+    """
+    input_paths = _write_input_frames(work_dir, bone_count, group_size, frame_count)
+    instructions_path = os.path.join(work_dir, "draw_instructions.json")
+    synthetic_frames.write_drawing_instructions(instructions_path, bone_count)
+    output_dir = os.path.join(work_dir, "draw")
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run():
+        for input_path in input_paths:
+            output_path = os.path.join(output_dir, os.path.basename(input_path).replace(".json", ".png"))
+            bone_viewer._draw_bones_from_files(input_path, instructions_path, output_path)
+
+    return run
+
+
+def _write_input_frames(work_dir, bone_count, group_size, frame_count):
+    """trim / draw の入力にする合成フレームJSONを保存する (同じ条件では一度だけ作成する)"""
+    input_dir = os.path.join(work_dir, "frames")
+    paths = sorted(
+        os.path.join(input_dir, filename) for filename in os.listdir(input_dir)
+    ) if os.path.isdir(input_dir) else []
+    if len(paths) != frame_count:
+        shutil.rmtree(input_dir, ignore_errors=True)
+        paths = synthetic_frames.write_frames(input_dir, frame_count, bone_count=bone_count, group_size=group_size)
+    return paths
+
+
+PREPARE_FUNCTIONS = {
+    "save": prepare_save,
+    "trim": prepare_trim,
+    "draw": prepare_draw,
+}
+
+
+def measure(run, frame_count, repeat=3):
+    """
+    処理を repeat 回実行して最も速かった時間を計測し、さらに1回実行して最大メモリ使用量を計測する
+
+    メモリの計測 (tracemalloc) は処理が遅くなるため、時間の計測とは別に行う。
+    tracemalloc は Python と numpy が確保したメモリを計測する (Pillow の画像のメモリは含まない)
+
+    Args:
+        run (callable): 1回分の処理
+        frame_count (int): 1回の処理で扱うフレーム数
+        repeat (int, optional): 時間を計測する回数. Defaults to 3.
+
+    Returns:
+        dict: 計測結果 (frames_per_second, seconds, peak_memory_mb)
+    """
+    # 標準出力への進捗表示は計測に含めない
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        "frames_per_second": frame_count / seconds,
+        "seconds": seconds,
+        "peak_memory_mb": peak / (1024 * 1024),
+    }
+
+
+def run_benchmarks(targets, bone_counts, group_sizes, frame_count, repeat=3):
+    """
+    全ての計測対象と条件の組み合わせを計測する
+
+    Args:
+        targets (list): 計測対象の名前 ("save", "trim", "draw") のリスト
+        bone_counts (list): ボーン数のリスト
+        group_sizes (list): 頂点グループごとの頂点数のリスト
+        frame_count (int): フレーム数
+        repeat (int, optional): 時間を計測する回数. Defaults to 3.
+
+    Returns:
+        list: 条件ごとの計測結果のリスト
+    """
+    results = []
+    for bone_count, group_size in itertools.product(bone_counts, group_sizes):
+        with tempfile.TemporaryDirectory(prefix="bone_benchmark_") as work_dir:
+            for target in targets:
+                run = PREPARE_FUNCTIONS[target](work_dir, bone_count, group_size, frame_count)
+                result = {
+                    "target": target,
+                    "bone_count": bone_count,
+                    "group_size": group_size,
+                    "frame_count": frame_count,
+                }
+                result.update(measure(run, frame_count, repeat))
+                print_result(result)
+                results.append(result)
+    return results
+
+
+def print_result(result):
+    """計測結果を1行で表示する"""
+    print(f"{result['target']:<5} ボーン {result['bone_count']:>5}  頂点 {result['group_size']:>6}  "
+          f"{result['frames_per_second']:9.1f} フレーム/秒  最大メモリ {result['peak_memory_mb']:8.1f} MB", flush=True)
+
+
+def compare_with_baseline(results, baseline_path, tolerance=0.2):
+    """
+    以前の計測結果と比較し、性能が低下した条件を表示する
+
+    Args:
+        results (list): 今回の計測結果
+        baseline_path (str): 以前の計測結果 (--output で保存したJSON) のパス
+        tolerance (float, optional): 許容する変化の割合 (0.2 の場合は 20% まで). Defaults to 0.2.
+
+    Returns:
+        list: 性能が低下した条件の説明のリスト
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    def case_key(result):
+        return result["target"], result["bone_count"], result["group_size"], result["frame_count"]
+
+    baseline_results = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = baseline_results.get(case_key(result))
+        if base is None:
+            continue
+        label = f"{result['target']} (ボーン {result['bone_count']}, 頂点 {result['group_size']})"
+        if result["frames_per_second"] < base["frames_per_second"] * (1 - tolerance):
+            regressions.append(f"{label}: {base['frames_per_second']:.1f} → {result['frames_per_second']:.1f} フレーム/秒")
+        if result["peak_memory_mb"] > base["peak_memory_mb"] * (1 + tolerance):
+            regressions.append(f"{label}: 最大メモリ {base['peak_memory_mb']:.1f} → {result['peak_memory_mb']:.1f} MB")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="合成したリグとフレームで各スクリプトの処理速度とメモリ使用量を計測する")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS),
+                        help="計測対象 (save: bone_info_save.py, trim: json_trim.py, draw: bone_viewer.py、指定しない場合は全て)")
+    parser.add_argument("--bones", type=int, nargs="+", default=[60, 240], help="ボーン数 (複数指定可)")
+    parser.add_argument("--group_size", type=int, nargs="+", default=[200, 2000], help="頂点グループごとの頂点数 (複数指定可)")
+    parser.add_argument("--frames", type=int, default=10, help="フレーム数")
+    parser.add_argument("--repeat", type=int, default=3, help="時間を計測する回数 (最も速かった時間を使う)")
+    parser.add_argument("--output", help="計測結果を保存するJSONファイルのパス")
+    parser.add_argument("--baseline", help="比較する以前の計測結果 (--output で保存したJSON) のパス")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="--baseline と比較する際に許容する変化の割合 (デフォルトは 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.targets, args.bones, args.group_size, args.frames, args.repeat)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=4, ensure_ascii=False)
+        print(f"計測結果を '{args.output}' に保存しました。")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"性能が {args.tolerance:.0%} 以上低下した条件があります:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("以前の計測結果から性能は低下していません。")
@@ -0,0 +1,85 @@
+"""
+Blender の外で bone_info_save.py を実行するための、最小限の bpy の代わり
+
+ベンチマーク用。シーンの中身は synthetic_scene.build_scene で作成する。
+"""
+import os
+import types
+
+import numpy as np
+
+
+class Collection(list):
+    """bpy_prop_collection の代わり (番号と名前での参照、foreach_get)"""
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            for item in self:
+                if item.name == key:
+                    return item
+            raise KeyError(key)
+        return list.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return any(item.name == key for item in self)
+        return list.__contains__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def foreach_get(self, attr, seq):
+        values = [np.ravel(np.asarray(getattr(item, attr), dtype=np.float64)) for item in self]
+        flat = np.concatenate(values) if values else np.empty(0)
+        if len(flat) != len(seq):
+            raise RuntimeError(f"foreach_get: 要素数が一致しません ({len(flat)} / {len(seq)})")
+        seq[:] = flat
+
+
+class Scene:
+    """bpy.types.Scene の代わり (frame_set でフレーム変更時の関数を呼び出す)"""
+
+    def __init__(self):
+        self.frame_start = 1
+        self.frame_end = 1
+        self.frame_step = 1
+        self.frame_current = 1
+        self.camera = None
+        self.render = types.SimpleNamespace(
+            resolution_x=1920, resolution_y=1080, resolution_percentage=100,
+            filepath="", fps=30, fps_base=1.0)
+        self.frame_change_handlers = []
+
+    def frame_set(self, frame):
+        self.frame_current = frame
+        for handler in self.frame_change_handlers:
+            handler(self, frame)
+
+
+class ViewLayer:
+    def update(self):
+        pass
+
+
+class Depsgraph:
+    pass
+
+
+class Context:
+    def __init__(self):
+        self.scene = Scene()
+        self.view_layer = ViewLayer()
+        self._depsgraph = Depsgraph()
+
+    def evaluated_depsgraph_get(self):
+        return self._depsgraph
+
+
+context = Context()
+data = types.SimpleNamespace(objects=Collection())
+app = types.SimpleNamespace(handlers=types.SimpleNamespace(render_post=[]))
+ops = types.SimpleNamespace(render=types.SimpleNamespace(render=lambda animation=False: None))
+path = types.SimpleNamespace(abspath=lambda p: os.path.join(os.getcwd(), p.lstrip("/")))
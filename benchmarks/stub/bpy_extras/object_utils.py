@@ -0,0 +1,24 @@
+"""bpy_extras.object_utils の代わり (world_to_camera_view は Blender と同じ計算)"""
+from mathutils import Vector
+
+
+def world_to_camera_view(scene, obj, coord):
+    """ワールド座標をカメラのビュー座標 (左下 (0, 0) から右上 (1, 1)、z は奥行き) に変換する"""
+    co_local = obj.matrix_world.normalized().inverted() @ coord
+    z = -co_local.z
+
+    camera = obj.data
+    frame = [v for v in camera.view_frame(scene=scene)[:3]]
+    if camera.type != 'ORTHO':
+        if z == 0.0:
+            return Vector((0.5, 0.5, 0.0))
+        else:
+            frame = [-(v / (v.z / z)) for v in frame]
+
+    min_x, max_x = frame[2].x, frame[1].x
+    min_y, max_y = frame[1].y, frame[0].y
+
+    x = (co_local.x - min_x) / (max_x - min_x)
+    y = (co_local.y - min_y) / (max_y - min_y)
+
+    return Vector((x, y, z))
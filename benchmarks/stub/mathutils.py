@@ -0,0 +1,97 @@
+"""Blender の外で bone_info_save.py を実行するための、numpy を使った最小限の mathutils (Vector / Matrix) の代わり"""
+import numpy as np
+
+
+class Vector:
+    """mathutils.Vector の代わり (要素は Blender と同じく単精度で取り出す)"""
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._v = np.array(values, dtype=np.float64)
+
+    x = property(lambda self: float(self._v[0]))
+    y = property(lambda self: float(self._v[1]))
+    z = property(lambda self: float(self._v[2]))
+
+    def __len__(self):
+        return len(self._v)
+
+    def __iter__(self):
+        return iter(self._v.astype(np.float32).tolist())
+
+    def __getitem__(self, i):
+        return float(np.float32(self._v[i]))
+
+    def __array__(self, dtype=None, copy=None):
+        return self._v.astype(dtype or np.float64)
+
+    def __add__(self, other):
+        return Vector(self._v + np.asarray(other, dtype=np.float64))
+
+    def __sub__(self, other):
+        return Vector(self._v - np.asarray(other, dtype=np.float64))
+
+    def __neg__(self):
+        return Vector(-self._v)
+
+    def __mul__(self, scalar):
+        return Vector(self._v * scalar)
+
+    def __truediv__(self, scalar):
+        return Vector(self._v / scalar)
+
+    def copy(self):
+        return Vector(self._v)
+
+
+class Matrix:
+    """mathutils.Matrix の代わり (4x4)"""
+
+    def __init__(self, rows=None):
+        self._m = np.identity(4) if rows is None else np.array(rows, dtype=np.float64)
+
+    @classmethod
+    def Translation(cls, v):
+        m = cls()
+        m._m[:3, 3] = np.asarray(v, dtype=np.float64)
+        return m
+
+    @classmethod
+    def Rotation(cls, angle, size, axis):
+        c, s = np.cos(angle), np.sin(angle)
+        i, j = {"X": (1, 2), "Y": (2, 0), "Z": (0, 1)}[axis]
+        m = cls()
+        m._m[i, i] = c
+        m._m[i, j] = -s
+        m._m[j, i] = s
+        m._m[j, j] = c
+        return m
+
+    @property
+    def translation(self):
+        return Vector(self._m[:3, 3])
+
+    def __array__(self, dtype=None, copy=None):
+        return self._m.astype(dtype or np.float64)
+
+    def __iter__(self):
+        return (Vector(row) for row in self._m)
+
+    def __len__(self):
+        return 4
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self._m @ other._m)
+        v = np.asarray(other, dtype=np.float64)
+        return Vector((self._m[:3, :3] @ v) + self._m[:3, 3])
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self._m))
+
+    def normalized(self):
+        m = self._m.copy()
+        m[:3, :3] /= np.linalg.norm(m[:3, :3], axis=0)
+        return Matrix(m)
+
+    def copy(self):
+        return Matrix(self._m)
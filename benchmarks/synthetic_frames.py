@@ -0,0 +1,146 @@
+"""
+bone_info_save.py が出力するものと同じ形式のフレームJSONを作成する
+
+json_trim.py と bone_viewer.py のベンチマーク用 (Blender や bpy は不要)
+"""
+import json
+import math
+import os
+import random
+
+
+def create_frame(frame, bone_count=60, group_size=500, group_names=("group1", "group2", "group3"),
+                 shape_key_count=8, resolution=(1920, 1080), seed=0):
+    """
+    1フレーム分のデータを作成する
+
+    Args:
+        frame (int): フレーム番号 (座標をフレームごとに少しずつ動かす)
+        bone_count (int, optional): ボーン数 (各ボーンは最大3つの子ボーンを持つ). Defaults to 60.
+        group_size (int, optional): 頂点グループごとの頂点数. Defaults to 500.
+        group_names (tuple, optional): 頂点グループ名. Defaults to ("group1", "group2", "group3").
+        shape_key_count (int, optional): シェイプキーの数. Defaults to 8.
+        resolution (tuple, optional): カメラの解像度. Defaults to (1920, 1080).
+        seed (int, optional): 乱数のシード (同じ値なら同じボーンの配置になる). Defaults to 0.
+
+    Returns:
+        dict: フレームのデータ
+    """
+    rng = random.Random(seed)
+    width, height = resolution
+    phase = frame * 0.1
+
+    def screen(x, y):
+        return [int(width * (0.5 + x * 0.4)), int(height * (0.9 - y * 0.4))]
+
+    bones = {}
+    for i in range(bone_count):
+        x = rng.uniform(-1.0, 1.0) + math.sin(phase + i) * 0.05
+        y = rng.uniform(0.0, 2.0) + math.cos(phase + i) * 0.05
+        bones[f"Bone_{i:03d}"] = {
+            "global_coords": [x, 0.0, y],
+            "screen_coords": screen(x, y),
+            "tail_global_coords": [x, 0.1, y],
+            "tail_screen_coords": screen(x, y + 0.05),
+            "children": [f"Bone_{child:03d}" for child in range(i * 3 + 1, min(i * 3 + 4, bone_count))],
+        }
+
+    data = {
+        "bones": bones,
+        "camera": {
+            "location": [0.0, -6.0, 1.0],
+            "rotation_euler": [math.pi / 2, 0.0, 0.0],
+            "focal_length": 50.0,
+            "resolution_x": float(width),
+            "resolution_y": float(height),
+        },
+    }
+
+    # 頂点グループ: 格子状に並んだ頂点と、隣り合う頂点を結ぶ辺
+    side = max(2, int(math.sqrt(group_size)))
+    wave = math.sin(phase) * 0.01
+    for group_index, group_name in enumerate(group_names):
+        vertices = []
+        for index in range(group_size):
+            x = (index % side) / side - 0.5 + group_index * 0.1
+            y = (index // side) / side * 2.0 + wave
+            vertices.append({"vertex_index": index, "screen_coords": screen(x, y), "global_coords": [x, 0.0, y]})
+        edges = [
+            {"edge_index": index, "screen_coords": [vertices[index]["screen_coords"], vertices[index + 1]["screen_coords"]]}
+            for index in range(group_size - 1)
+            if (index + 1) % side
+        ]
+        data[group_name] = {"vertices": vertices, "edges": edges}
+
+    data["shape_keys"] = {f"Key_{k}": (math.sin(phase + k) + 1.0) / 2.0 for k in range(shape_key_count)}
+    return data
+
+
+def write_frames(output_dir, frame_count=10, **kwargs):
+    """
+    フレームJSONを bone_info_save.py と同じファイル名 (0001.json, ...) で保存する
+
+    Args:
+        output_dir (str): 保存先のフォルダ
+        frame_count (int, optional): フレーム数. Defaults to 10.
+        **kwargs: create_frame に渡す引数 (bone_count, group_size など)
+
+    Returns:
+        list: 保存したJSONファイルのパスのリスト
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for frame in range(1, frame_count + 1):
+        path = os.path.join(output_dir, f"{frame:04d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(create_frame(frame, **kwargs), f, indent=4, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def write_bone_name_csv(csv_path, bone_count=60):
+    """
+    json_trim.py 用のボーン名変換情報CSVを保存する (偶数番目のボーンのみを別名に変換する)
+
+    Args:
+        csv_path (str): 保存するCSVファイルのパス
+        bone_count (int, optional): ボーン数. Defaults to 60.
+    """
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("original_name,new_name\n")
+        for i in range(0, bone_count, 2):
+            f.write(f"Bone_{i:03d},Trim_{i:03d}\n")
+
+
+def write_drawing_instructions(instructions_path, bone_count=60):
+    """
+    bone_viewer.py 用の描画方法JSONを保存する
+
+    固定の枠線 (静的なレイヤー)、全てのボーンの関節と親子の線 (joints / limbs)、
+    式で座標を指定する円と折れ線 (ボーン数に比例) を含む
+
+    Args:
+        instructions_path (str): 保存するJSONファイルのパス
+        bone_count (int, optional): ボーン数. Defaults to 60.
+    """
+    instructions = [
+        {"index": 0, "draw_type": "rectangle", "x": 960, "y": 540, "width": 1800, "height": 1000, "color": "lightgray"},
+        {"index": 10, "draw_type": "limbs", "color": "blue", "size": 3},
+        {"index": 20, "draw_type": "joints", "color": "red", "size": 6},
+    ]
+    for i in range(0, bone_count, 4):
+        name = f"BONES_BONE_{i:03d}"
+        instructions.append({
+            "index": 30 + i, "draw_type": "circle",
+            "x": f"{name}_TAIL_SCREEN_COORDS_0", "y": f"{name}_TAIL_SCREEN_COORDS_1",
+            "size": 4, "color": "green",
+        })
+    instructions.append({
+        "index": 30 + bone_count, "draw_type": "polyline",
+        "x1": "GROUP1_VERTICES_0_SCREEN_COORDS_0", "y1": "GROUP1_VERTICES_0_SCREEN_COORDS_1",
+        "x2": "GROUP1_VERTICES_1_SCREEN_COORDS_0 + CAMERA_RESOLUTION_X / 100", "y2": "GROUP1_VERTICES_1_SCREEN_COORDS_1",
+        "x3": "BONES_BONE_000_SCREEN_COORDS_0", "y3": "BONES_BONE_000_SCREEN_COORDS_1",
+        "color": "purple", "width": 2,
+    })
+    with open(instructions_path, "w", encoding="utf-8") as f:
+        json.dump({"bones": instructions}, f, indent=4, ensure_ascii=False)
@@ -0,0 +1,167 @@
+"""
+stub の bpy の中に、アニメーションするアーマチュアとメッシュ、カメラを持つシーンを作成する
+
+bone_info_save.py のベンチマーク用 (benchmarks/stub を sys.path に追加してから import すること)
+"""
+import math
+import types
+
+import numpy as np
+
+import bpy
+from bpy import Collection
+from mathutils import Matrix, Vector
+
+
+class PoseBone:
+    def __init__(self, name, parent, rest):
+        self.name = name
+        self.parent = parent
+        self.children = Collection()
+        self.rest = np.array(rest, dtype=np.float64)
+        self.matrix = Matrix.Translation(self.rest)
+        self.head = Vector(self.rest)
+        self.tail = Vector(self.rest + (0.0, 0.1, 0.0))
+
+
+class VertexGroupElement:
+    def __init__(self, group, weight):
+        self.group = group
+        self.weight = weight
+
+
+class Vertex:
+    def __init__(self, index, co, groups):
+        self.index = index
+        self.co = Vector(co)
+        self.groups = groups
+
+
+class Edge:
+    def __init__(self, index, vertices):
+        self.index = index
+        self.vertices = vertices
+
+
+class Object:
+    def __init__(self, name, type, data=None):
+        self.name = name
+        self.type = type
+        self.data = data
+        self.matrix_world = Matrix()
+        self.location = Vector((0.0, 0.0, 0.0))
+        self.rotation_euler = Vector((0.0, 0.0, 0.0))
+        self.vertex_groups = Collection()
+        self.evaluated_data = data
+        self.armature = None
+
+    def evaluated_get(self, depsgraph):
+        return types.SimpleNamespace(data=self.evaluated_data, matrix_world=self.matrix_world)
+
+    def find_armature(self):
+        return self.armature
+
+
+class CameraData:
+    def __init__(self, type="PERSP", lens=50.0, sensor_width=36.0):
+        self.type = type
+        self.lens = lens
+        self.sensor_width = sensor_width
+        self.ortho_scale = 6.0
+
+    def view_frame(self, scene=None):
+        aspect = scene.render.resolution_x / scene.render.resolution_y
+        if self.type == "ORTHO":
+            hx, d = self.ortho_scale / 2, -1.0
+        else:
+            hx, d = self.sensor_width / 2 / self.lens, -1.0
+        hy = hx / aspect
+        return (Vector((hx, hy, d)), Vector((hx, -hy, d)), Vector((-hx, -hy, d)), Vector((-hx, hy, d)))
+
+
+def build_scene(bone_count=60, group_size=500, group_names=("group1", "group2", "group3"),
+                shape_key_count=8, frame_count=10, camera_type="PERSP"):
+    """
+    bpy.data と bpy.context.scene に、フレームごとに動くアーマチュアとメッシュのシーンを作成する
+
+    Args:
+        bone_count (int, optional): ボーン数 (各ボーンは最大3つの子ボーンを持つ). Defaults to 60.
+        group_size (int, optional): 頂点グループごとの頂点数 (おおよそ). Defaults to 500.
+        group_names (tuple, optional): 頂点グループ名. Defaults to ("group1", "group2", "group3").
+        shape_key_count (int, optional): シェイプキーの数. Defaults to 8.
+        frame_count (int, optional): フレーム数 (1 から frame_count まで). Defaults to 10.
+        camera_type (str, optional): カメラの種類 ("PERSP" または "ORTHO"). Defaults to "PERSP".
+
+    Returns:
+        bpy.Scene: 作成したシーン
+    """
+    bpy.data.objects.clear()
+    scene = bpy.context.scene = bpy.Scene()
+    scene.frame_start, scene.frame_end = 1, frame_count
+
+    # アーマチュア: ルートボーンから枝分かれするボーン
+    armature = Object("Armature", "ARMATURE")
+    armature.pose = types.SimpleNamespace(bones=Collection())
+    rng = np.random.default_rng(0)
+    for i in range(bone_count):
+        parent = armature.pose.bones[(i - 1) // 3] if i else None
+        rest = rng.uniform(-1.0, 1.0, 3) * (0.3, 0.3, 1.0) + (0.0, 0.0, 1.0)
+        bone = PoseBone(f"Bone_{i:03d}", parent, rest)
+        if parent:
+            parent.children.append(bone)
+        armature.pose.bones.append(bone)
+
+    # メッシュ: 格子状の頂点 (頂点グループは順番に割り当て、一部はウェイト 0 や複数のグループに属する)
+    side = max(2, int(math.sqrt(group_size * len(group_names))))
+    rest_co = np.array([(x / side - 0.5, 0.0, y / side * 2.0) for y in range(side) for x in range(side)])
+    vertices = Collection()
+    for index, co in enumerate(rest_co):
+        groups = [VertexGroupElement(index % len(group_names), 1.0 if index % 7 else 0.0)]
+        if index % 5 == 0:
+            groups.append(VertexGroupElement((index + 1) % len(group_names), 0.5))
+        vertices.append(Vertex(index, co, groups))
+    edges = Collection()
+    for y in range(side):
+        for x in range(side):
+            v = y * side + x
+            if x + 1 < side:
+                edges.append(Edge(len(edges), (v, v + 1)))
+            if y + 1 < side:
+                edges.append(Edge(len(edges), (v, v + side)))
+    key_blocks = Collection([types.SimpleNamespace(name="Basis", value=0.0)] +
+                            [types.SimpleNamespace(name=f"Key_{k}", value=0.0) for k in range(shape_key_count)])
+    mesh_data = types.SimpleNamespace(vertices=vertices, edges=edges,
+                                      shape_keys=types.SimpleNamespace(key_blocks=key_blocks))
+    evaluated = types.SimpleNamespace(vertices=Collection(Vertex(v.index, v.co, v.groups) for v in vertices),
+                                      edges=edges)
+    mesh = Object("Body", "MESH", mesh_data)
+    mesh.evaluated_data = evaluated
+    mesh.armature = armature
+    mesh.vertex_groups = Collection(types.SimpleNamespace(name=n, index=i) for i, n in enumerate(group_names))
+
+    camera = Object("Camera", "CAMERA", CameraData(camera_type))
+    camera.matrix_world = Matrix.Translation((0.0, -6.0, 1.0)) @ Matrix.Rotation(math.pi / 2, 4, "X")
+    camera.location = Vector((0.0, -6.0, 1.0))
+    camera.rotation_euler = Vector((math.pi / 2, 0.0, 0.0))
+    scene.camera = camera
+
+    bpy.data.objects.extend([armature, mesh, camera])
+
+    def update(scene, frame):
+        # フレームごとにボーンとメッシュを少しずつ動かし、シェイプキーの値を変える
+        phase = frame * 0.1
+        for i, bone in enumerate(armature.pose.bones):
+            offset = np.array((math.sin(phase + i), 0.0, math.cos(phase + i))) * 0.05
+            position = bone.rest + offset
+            bone.matrix = Matrix.Translation(position)
+            bone.head = Vector(position)
+            bone.tail = Vector(position + (0.0, 0.1, 0.0))
+        wave = math.sin(phase) * 0.01
+        for vertex, rest in zip(evaluated.vertices, rest_co):
+            vertex.co = Vector(rest + (0.0, wave, 0.0))
+        for k, block in enumerate(key_blocks[1:]):
+            block.value = (math.sin(phase + k) + 1.0) / 2.0
+
+    scene.frame_change_handlers.append(update)
+    scene.frame_set(scene.frame_start)
+    return scene
@@ -1,6 +1,75 @@
 from PIL import Image, ImageDraw, ImageFont
+import functools
 import importlib
 import io
+import os
+import re
+from collections.abc import Mapping
+
+
+# 読み込んだフォント、ビットマップ画像、カスタム描画関数のキャッシュ (プロセスごとに一度だけ読み込む)
+_fonts = {}
+_bitmaps = {}
+_custom_functions = {}
+
+
+def load_font(font_family, font_size):
+    """
+    フォントを読み込む (同じフォントとサイズは一度だけ読み込む)
+
+    Args:
+        font_family (str): フォント名またはフォントファイルのパス
+        font_size (int): フォントサイズ
+
+    Returns:
+        ImageFont.FreeTypeFont: フォント
+    """
+    key = (font_family, font_size)
+    font = _fonts.get(key)
+    if font is None:
+        font = ImageFont.truetype(font_family, font_size)
+        _fonts[key] = font
+    return font
+
+
+def load_bitmap(image_path):
+    """
+    画像を白黒に変換して読み込む (ファイルが更新されるまでは一度だけ読み込む)
+
+    Args:
+        image_path (str): 画像ファイルのパス
+
+    Returns:
+        Image.Image: 白黒 ("1" モード) の画像
+    """
+    key = (image_path, os.path.getmtime(image_path))
+    bitmap = _bitmaps.get(key)
+    if bitmap is None:
+        with Image.open(image_path) as image:
+            bitmap = image.convert("1")
+        _bitmaps[key] = bitmap
+    return bitmap
+
+
+def load_custom_function(library_name, function_name):
+    """
+    カスタム描画関数を取得する (同じライブラリと関数は一度だけインポートする)
+
+    Args:
+        library_name (str): ライブラリ名
+        function_name (str): 関数名
+
+    Returns:
+        callable: 描画関数
+    """
+    key = (library_name, function_name)
+    function = _custom_functions.get(key)
+    if function is None:
+        # ライブラリを動的にインポート
+        library = importlib.import_module(library_name)
+        function = getattr(library, function_name)
+        _custom_functions[key] = function
+    return function
 
 
 def draw_circle(draw, data, width, height, instruction, global_vars):  
@@ -178,7 +247,7 @@ def draw_bitmap(draw, data, width, height, instruction, global_vars):
 
     if all([x, y, image_path]):
         try:
-            bitmap = Image.open(image_path).convert("1")  # 白黒に変換
+            bitmap = load_bitmap(image_path)  # 白黒に変換した画像
             draw.bitmap((x, y), bitmap)
         except FileNotFoundError:
             print(f"画像ファイルが見つかりません: {image_path}")
@@ -199,8 +268,9 @@ def draw_text(draw, data, width, height, instruction, global_vars):
 
     if all([x, y, text]):
         try:
-            font = ImageFont.truetype(font_family, font_size)
-            text_width, text_height = draw.textsize(text, font=font)
+            font = load_font(font_family, font_size)
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+            text_width, text_height = right - left, bottom - top
             # テキストの中心位置を計算
             x -= text_width / 2
             y -= text_height / 2
@@ -220,14 +290,13 @@ def custom(data, width, height, instruction, global_vars):
         width (int): 画像の幅
         height (int): 画像の高さ
         instruction (dict): 描画命令
-        global_vars (dict): グローバル変数の辞書
+        global_vars (FrameNamespace): フレームの定数の名前空間 (読み取り専用、グローバル変数の辞書は global_vars.global_vars)
 
     Returns:
         Image.Image or None: 描画結果の PIL Image オブジェクト、またはエラーが発生した場合は None
     """
     library_name = instruction.get("library")
     function_name = instruction.get("function")
-    params = instruction.get("params", {})
 
     if not all([library_name, function_name]):
         print("ライブラリ名と関数名が指定されていません")
@@ -235,14 +304,11 @@ def custom(data, width, height, instruction, global_vars):
 
     try:
         # ライブラリを動的にインポート
-        library = importlib.import_module(library_name)
-        function = getattr(library, function_name)
+        function = load_custom_function(library_name, function_name)
 
         # パラメータに data, width, height, global_vars を追加
-        params["data"] = data
-        params["width"] = width
-        params["height"] = height
-        params["global_vars"] = global_vars  
+        # (先読みのスレッドと同じ描画命令を使うため、描画命令の params は書き換えずに呼び出しごとに作成する)
+        params = dict(instruction.get("params", {}), data=data, width=width, height=height, global_vars=global_vars)
 
         # 描画関数を実行
         result = function(**params)
@@ -274,47 +340,325 @@ def custom(data, width, height, instruction, global_vars):
         return None
 
 
+def draw_custom(draw, data, width, height, instruction, global_vars):
+    """他のライブラリで描画した画像を貼り付ける"""
+    custom_image = custom(data, width, height, instruction, global_vars)
+    if custom_image:
+        draw.bitmap((0, 0), custom_image)
+
+
+def draw_joints(draw, data, width, height, instruction, global_vars):
+    """pattern に一致する全てのボーンの位置に円を描画する (ボーンごとに式を書かなくてよい)"""
+    bones = data.get("bones") or {}
+    coords_key = instruction.get("coords", "screen_coords")
+    color = instruction.get("color", "black")
+    size = int(instruction.get("size", 5))
+
+    names, _ = _matching_bones(bones, instruction.get("pattern"))
+    for name in names:
+        coords = bones[name].get(coords_key)
+        if coords is None:
+            continue
+        x, y = coords[0], coords[1]
+        if _in_frame(x, y, width, height):
+            draw.ellipse((x - size, y - size, x + size, y + size), fill=color)
+
+
+def draw_limbs(draw, data, width, height, instruction, global_vars):
+    """pattern に一致する全てのボーンについて、親ボーンから子ボーン (children) の位置まで線を描画する"""
+    bones = data.get("bones") or {}
+    coords_key = instruction.get("coords", "screen_coords")
+    color = instruction.get("color", "black")
+    size = int(instruction.get("size", 2))
+
+    names, selected = _matching_bones(bones, instruction.get("pattern"))
+    for name in names:
+        bone = bones[name]
+        start = bone.get(coords_key)
+        # カメラの後ろや画面外のボーンは draw_joints と同じく描画しない
+        if start is None or not _in_frame(start[0], start[1], width, height):
+            continue
+        for child in bone.get("children") or ():
+            # 子ボーンも pattern に一致する場合のみ描画する
+            if child not in selected:
+                continue
+            end = bones[child].get(coords_key)
+            if end is not None and _in_frame(end[0], end[1], width, height):
+                draw.line((start[0], start[1], end[0], end[1]), fill=color, width=size)
+
+
+def _in_frame(x, y, width, height):
+    """座標がキャンバスの範囲内かどうか"""
+    return 0 <= x < width and 0 <= y < height
+
+
+def _matching_bones(bones, pattern):
+    """
+    フレームのボーンのうち pattern (正規表現) に一致するものを取得する
+
+    Returns:
+        tuple: (ボーン名のタプル (フレームの順番), ボーン名の frozenset)
+    """
+    return _match_bone_names(tuple(bones), pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _match_bone_names(names, pattern):
+    """ボーン名の一覧を pattern で絞り込む (同じボーン構成のフレームでは一度だけ行う)"""
+    if pattern:
+        regex = re.compile(pattern)
+        names = tuple(name for name in names if regex.search(name))
+    return names, frozenset(names)
+
+
+class ScaledDraw:
+    """
+    ImageDraw.Draw の代わりに描画関数に渡し、座標と線の太さ、文字や画像の大きさを scale 倍してから描画する
+
+    描画関数と描画命令は元の解像度の座標のまま使い、縮小した画像に直接描画できる (プレビュー用)。
+    ここに無いメソッドは元の ImageDraw.Draw のものをそのまま使う。
+
+    Args:
+        draw (ImageDraw.Draw): 縮小した画像の描画オブジェクト
+        scale (float): 元の解像度に対する縮小率
+    """
+
+    def __init__(self, draw, scale):
+        self.draw = draw
+        self.scale = scale
+
+    def __getattr__(self, name):
+        return getattr(self.draw, name)
+
+    def _xy(self, xy):
+        """座標 (数値の並び、または (x, y) の並び) を scale 倍する"""
+        return [
+            tuple(v * self.scale for v in value) if isinstance(value, (tuple, list)) else value * self.scale
+            for value in xy
+        ]
+
+    def _width(self, width):
+        """線の太さを scale 倍する (0 以外は最低 1 ピクセル)"""
+        return max(1, round(width * self.scale)) if width else width
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        return self.draw.ellipse(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        return self.draw.line(self._xy(xy), fill=fill, width=self._width(width), joint=joint)
+
+    def polygon(self, xy, fill=None, outline=None, width=1):
+        return self.draw.polygon(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        return self.draw.rectangle(self._xy(xy), fill=fill, outline=outline, width=self._width(width))
+
+    def arc(self, xy, start, end, fill=None, width=1):
+        return self.draw.arc(self._xy(xy), start, end, fill=fill, width=self._width(width))
+
+    def chord(self, xy, start, end, fill=None, outline=None, width=1):
+        return self.draw.chord(self._xy(xy), start, end, fill=fill, outline=outline, width=self._width(width))
+
+    def pieslice(self, xy, start, end, fill=None, outline=None, width=1):
+        return self.draw.pieslice(self._xy(xy), start, end, fill=fill, outline=outline, width=self._width(width))
+
+    def point(self, xy, fill=None):
+        return self.draw.point(self._xy(xy), fill=fill)
+
+    def bitmap(self, xy, bitmap, fill=None):
+        size = (max(1, round(bitmap.width * self.scale)), max(1, round(bitmap.height * self.scale)))
+        return self.draw.bitmap(self._xy(xy), bitmap.resize(size, Image.NEAREST), fill=fill)
+
+    def text(self, xy, text, fill=None, font=None, **kwargs):
+        if font is not None and isinstance(getattr(font, "path", None), str):
+            font = load_font(font.path, max(1, round(font.size * self.scale)))
+        elif font is not None and hasattr(font, "font_variant"):
+            font = font.font_variant(size=max(1, round(font.size * self.scale)))
+        return self.draw.text(self._xy(xy), text, fill=fill, font=font, **kwargs)
+
+
+# draw_type と描画関数の対応表
+DRAW_FUNCTIONS = {
+    "circle": draw_circle,
+    "ellipse": draw_ellipse,
+    "line": draw_line,
+    "polyline": draw_polyline,
+    "rectangle": draw_rectangle,
+    "arc": draw_arc,
+    "point": draw_point,
+    "polygon": draw_polygon,
+    "pieslice": draw_pieslice,
+    "chord": draw_chord,
+    "bitmap": draw_bitmap,
+    "text": draw_text,
+    "custom": draw_custom,
+    "joints": draw_joints,
+    "limbs": draw_limbs,
+}
+
+# 式に関係なくフレームのデータを直接参照する draw_type
+FRAME_DATA_DRAW_TYPES = {"custom", "joints", "limbs"}
+
+# 式として評価される描画命令のキー (x, y, start_x, ..., x1, y1, ...)
+EXPRESSION_KEY_PATTERN = re.compile(r"^(x|y|start_x|start_y|end_x|end_y|x\d+|y\d+)$")
+
+# コンパイル済みの式のキャッシュ
+_compiled_expressions = {}
+
+
+def compile_expression(expression):
+    """
+    式をコードオブジェクトにコンパイルする (同じ式は一度だけコンパイルする)
+
+    Args:
+        expression (str): 式
+
+    Returns:
+        code: コンパイル済みの式
+    """
+    code = _compiled_expressions.get(expression)
+    if code is None:
+        code = compile(expression, "<expression>", "eval")
+        _compiled_expressions[expression] = code
+    return code
+
+
 def _evaluate_expression(expression, data, global_vars):
     """式を評価する"""
     if expression is None or not isinstance(expression, str):
         return expression
 
     try:
-        # JSONの全ての要素を定数として設定
-        set_constants_from_data(data)  # この行を追加
+        code = compile_expression(expression)
 
-        # 式を評価
-        return eval(expression, global_vars)  # global_vars を使用して評価
+        # フレームデータの定数は名前空間から必要な分だけ参照する
+        if isinstance(global_vars, FrameNamespace):
+            namespace = global_vars
+        else:
+            namespace = FrameNamespace(data, global_vars)
+
+        # 式を評価 (定数は名前空間、それ以外は global_vars から参照)
+        return eval(code, namespace.global_vars, namespace)
     except Exception as e:
         print(f"式の評価中にエラーが発生しました: {expression} : {e}") # エラーメッセージを詳細化
         return None
 
-def set_constants_from_data(data):
+
+class FrameNamespace(Mapping):
     """
-    JSONデータの全ての要素を定数にする（リストにも対応）
+    JSONデータの全ての要素を定数名で参照するための名前空間（リストにも対応）
+
+    定数名 (例: BONES_J_BIP_C_HEAD_SCREEN_COORDS_0) は参照された時点でデータを辿って解決し、
+    結果はこの名前空間の中でキャッシュする。フレームごとに1つ作成して eval の locals として渡すことで、
+    式の評価コストがフレームデータの大きさに比例しなくなる。
 
     Args:
         data (dict or list): JSONデータ
+        global_vars (dict, optional): 式の評価に使うグローバル変数の辞書
     """
 
-    def set_constants(data, prefix=""):
+    def __init__(self, data, global_vars=None):
+        self.data = data
+        self.global_vars = global_vars if global_vars is not None else {}
+        self._cache = {}
+        self._key_maps = {}
+        self._constants = None
+
+    def __getitem__(self, name):
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+
+        found, value = self._resolve(self.data, name)
+        if not found:
+            raise KeyError(name)
+
+        value = self._evaluate_value(value)
+        self._cache[name] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._all_constants())
+
+    def __len__(self):
+        return len(self._all_constants())
+
+    def _key_map(self, data):
+        """辞書のキーを定数名の形式 (大文字、英数字とアンダースコアのみ) に変換した対応表を返す"""
+        key_map = self._key_maps.get(id(data))
+        if key_map is None:
+            key_map = {_constant_name(key): value for key, value in data.items()}
+            self._key_maps[id(data)] = key_map
+        return key_map
+
+    def _resolve(self, data, name):
         """
-        再帰的にJSONデータを走査して定数を設定する
+        定数名に対応する値をデータから探す
 
         Args:
-            data (dict or list): JSONデータ
-            prefix (str): 定数名のプレフィックス
+            data (dict or list): 探索するJSONデータ
+            name (str): data から見た定数名
+
+        Returns:
+            tuple: (見つかったかどうか, 値)
         """
         if isinstance(data, dict):
-            for key, value in data.items():
-                new_prefix = f"{prefix}{key.upper()}_" if prefix else f"{key.upper()}_"
-                set_constants(value, new_prefix)
+            key_map = self._key_map(data)
+            # キー自体にアンダースコアが含まれるため、区切り位置を順に試す
+            pos = -1
+            while True:
+                pos = name.find("_", pos + 1)
+                key = name if pos < 0 else name[:pos]
+                if key in key_map:
+                    found, value = self._resolve_child(key_map[key], None if pos < 0 else name[pos + 1:])
+                    if found:
+                        return found, value
+                if pos < 0:
+                    return False, None
         elif isinstance(data, list):
-            for i, item in enumerate(data):  # リストの要素にアクセス
-                new_prefix = f"{prefix}{i}_" 
-                set_constants(item, new_prefix)  # 各要素に対して再帰的に定数を設定
-        else:
-            constant_name = prefix.rstrip("_")
-            globals()[constant_name] = data  # グローバル変数に設定
-
-    set_constants(data)
\ No newline at end of file
+            index, sep, rest = name.partition("_")
+            if index.isdigit() and str(int(index)) == index and int(index) < len(data):
+                return self._resolve_child(data[int(index)], rest if sep else None)
+        return False, None
+
+    def _resolve_child(self, value, rest):
+        """子要素から残りの定数名を解決する (rest が None の場合は値そのものが対象)"""
+        if rest is None:
+            if isinstance(value, (dict, list)):
+                return False, None  # 定数になるのは末端の値のみ
+            return True, value
+        return self._resolve(value, rest)
+
+    def _evaluate_value(self, value):
+        """値が文字列型で、"=" で始まっている場合は式として評価する"""
+        if isinstance(value, str) and value.startswith("="):
+            try:
+                return eval(value[1:], self.global_vars, self)  # "="を除去して評価
+            except Exception as e:
+                print(f"式 '{value}' の評価中にエラーが発生しました: {e}")
+        return value
+
+    def _all_constants(self):
+        """全ての定数名と値を辞書として返す (反復処理された場合のみ作成する)"""
+        if self._constants is None:
+            constants = {}
+
+            def set_constants(data, prefix=""):
+                if isinstance(data, dict):
+                    for key, value in data.items():
+                        set_constants(value, f"{prefix}{_constant_name(key)}_")
+                elif isinstance(data, list):
+                    for i, item in enumerate(data):
+                        set_constants(item, f"{prefix}{i}_")
+                else:
+                    constants[prefix.rstrip("_")] = data
+
+            set_constants(self.data)
+            self._constants = {name: self[name] for name in constants}
+        return self._constants
+
+
+def _constant_name(key):
+    """キー名を大文字にし、英数字とアンダースコアのみで構成されるように変換する"""
+    return re.sub(r"[^a-zA-Z0-9_]", "_", str(key).upper())
\ No newline at end of file
@@ -1,9 +1,22 @@
 import bpy
+import argparse
+import hashlib
 import json
+import math
 import os
+import sys
+import time
 import mathutils
+import numpy as np
 from bpy_extras.object_utils import world_to_camera_view
 
+# 同じフォルダにあるモジュール (frame_store.py) を読み込めるようにする
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+if _script_dir not in sys.path:
+    sys.path.append(_script_dir)
+import frame_store
+import json_trim
+
 # モード選択 (レンダリングモード: True, フレーム保存モード: False)
 rendering_mode = False
 
@@ -13,6 +26,191 @@ export_shape_keys = True
 # JSONファイルを保存するフォルダ (指定しない場合は空文字列)
 json_output_folder = "" 
 
+# 出力しないキーを記述したテキストファイルのパス (json_trim.py の -e と同じ形式、指定しない場合は空文字列)
+# 記述したキー (global_coords, children など) は計算自体を行わない
+exclude_keys_file = ""
+
+# ボーン名変換情報を記述したCSVファイルのパス (json_trim.py の -c と同じ形式、指定しない場合は空文字列)
+# 指定した場合は、CSVに含まれるボーンのみを変換後のボーン名で出力する
+bone_name_csv_path = ""
+
+# exclude_keys_file と bone_name_csv_path から読み込んだ内容 (main で設定する)
+excluded_fields = frozenset()
+bone_name_mapping = None
+
+# 出力形式 ("json": フレームごとのJSONファイル, "npz": 全フレームを列ごとの配列にまとめた1つの .npz ファイル,
+#          "jsonl": 1行1フレームの JSON Lines ファイル)
+output_format = "json"
+
+# フレームによって変わらない情報 (ボーンの順番と親子関係、頂点グループの頂点番号と辺の構成) を
+# 一度だけ rig として保存し、フレームごとには変化する値のみを保存するかどうか ("json" / "jsonl" 形式で有効、
+# "json" 形式では出力フォルダに rig.json を保存する。"npz" 形式は常に分けて保存する)
+split_rig = False
+
+# "json" 形式で split_rig が True の場合に、最初のフレームから作成した rig
+frame_rig = None
+
+# ポーズ行列、カメラ、シェイプキーの値、メッシュの位置が直前に保存したフレームと同じ場合に、
+# フレームの内容を保存せずに参照 ({"same_as": フレーム番号}) のみを保存するかどうか
+# (ポーズやシェイプキー以外で変形するメッシュ (物理演算など) がある場合は使用しないこと)
+dedupe_frames = False
+
+# dedupe_frames が True の場合に、直前に内容を保存したフレームの情報 (状態のハッシュ値とフレーム番号)
+previous_frame = None
+
+# 参照のみを保存したフレーム (フレーム番号 → 参照先のフレーム番号、マニフェストの出力に使用)
+duplicate_frames = {}
+
+# 保存したJSONファイルのパス (フレーム番号 → パス、マニフェストの出力に使用)
+saved_frame_files = {}
+
+# npz / jsonl 形式で保存する場合の書き込み先 (main で作成する)
+animation_writer = None
+
+# フレームごとに処理段階 (frame_set、ボーン、頂点グループ、保存など) の時間と件数を記録し、
+# 最後に集計 (段階ごとの平均と p95、最も遅いフレーム) を表示するかどうか
+profile_stages = False
+
+# profile_stages が True の場合に、集計結果とフレームごとの記録を保存するJSONファイルのパス (指定しない場合は空文字列)
+profile_output_path = ""
+
+# profile_stages が True の場合の記録先 (main で作成する)
+stage_profiler = None
+
+
+class StageProfiler:
+    """
+    フレームごとに処理段階の時間 (経過時間) と件数 (ボーン数、頂点数、辺の数) を記録する
+
+    フレームの処理中に lap(段階名) を呼び出すと、前回の lap (またはフレームの開始) からの時間をその段階に加算する
+    """
+
+    def __init__(self):
+        self.frames = []
+        self._current = None
+        self._last_time = None
+
+    def start_frame(self, frame):
+        """フレームの記録を開始する"""
+        self._current = {"frame": frame, "stages": {}, "counts": {}, "total": 0.0}
+        self._last_time = self._start_time = time.perf_counter()
+
+    def lap(self, stage):
+        """前回の lap からの時間を stage に加算する"""
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        stages = self._current["stages"]
+        stages[stage] = stages.get(stage, 0.0) + (now - self._last_time)
+        self._last_time = now
+
+    def count(self, name, value):
+        """フレームで扱った件数を加算する"""
+        if self._current is None:
+            return
+        counts = self._current["counts"]
+        counts[name] = counts.get(name, 0) + value
+
+    def end_frame(self):
+        """フレームの記録を終了する (最後の lap 以降の時間は "other" に加算する)"""
+        if self._current is None:
+            return
+        self.lap("other")
+        self._current["total"] = time.perf_counter() - self._start_time
+        self.frames.append(self._current)
+        self._current = None
+
+    def summary(self, slowest_count=5):
+        """
+        記録を集計する
+
+        Args:
+            slowest_count (int, optional): 最も遅いフレームとして出力する数. Defaults to 5.
+
+        Returns:
+            dict: 段階ごとの時間 (ミリ秒の平均、p95、最大と合計の秒数)、1フレームあたりの平均件数、最も遅いフレーム
+        """
+        stage_names = []
+        for record in self.frames:
+            for stage in record["stages"]:
+                if stage not in stage_names:
+                    stage_names.append(stage)
+
+        total = sum(record["total"] for record in self.frames)
+        stages = {}
+        for stage in stage_names + ["total"]:
+            values = sorted(
+                record["total"] if stage == "total" else record["stages"].get(stage, 0.0)
+                for record in self.frames
+            )
+            stages[stage] = {
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p95_ms": values[max(0, math.ceil(len(values) * 0.95) - 1)] * 1000,
+                "max_ms": values[-1] * 1000,
+                "total_s": sum(values),
+                "share": sum(values) / total if total else 0.0,
+            }
+
+        count_names = sorted({name for record in self.frames for name in record["counts"]})
+        counts = {
+            name: sum(record["counts"].get(name, 0) for record in self.frames) / len(self.frames)
+            for name in count_names
+        }
+
+        slowest = sorted(self.frames, key=lambda record: record["total"], reverse=True)[:slowest_count]
+        return {
+            "frame_count": len(self.frames),
+            "stages": stages,
+            "counts": counts,
+            "slowest_frames": [
+                {
+                    "frame": record["frame"],
+                    "total_ms": record["total"] * 1000,
+                    "stages_ms": {stage: value * 1000 for stage, value in record["stages"].items()},
+                }
+                for record in slowest
+            ],
+        }
+
+    def print_report(self):
+        """集計結果を表示する"""
+        if not self.frames:
+            print("処理段階の時間を記録したフレームがありません。")
+            return
+        summary = self.summary()
+        print(f"処理段階ごとの時間 ({summary['frame_count']} フレーム):")
+        # 全角文字は2文字分の幅で表示されるため、その分を詰めて揃える
+        print(f"  {'段階':<18}{'平均(ms)':>8}{'p95(ms)':>10}{'最大(ms)':>8}{'合計(s)':>8}{'割合':>7}")
+        for stage, stats in summary["stages"].items():
+            print(f"  {stage:<20}{stats['mean_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+                  f"{stats['total_s']:>10.2f}{stats['share']:>9.1%}")
+        if summary["counts"]:
+            counts = ", ".join(f"{name} {value:.0f}" for name, value in summary["counts"].items())
+            print(f"1フレームあたりの件数: {counts}")
+        print("最も遅いフレーム:")
+        for record in summary["slowest_frames"]:
+            stage, value = max(record["stages_ms"].items(), key=lambda item: item[1])
+            print(f"  フレーム {record['frame']}: {record['total_ms']:.2f} ms ({stage} {value:.2f} ms)")
+
+    def write_report(self, report_path):
+        """集計結果とフレームごとの記録をJSONに保存する"""
+        report = self.summary() if self.frames else {"frame_count": 0}
+        report["frames"] = self.frames
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+
+
+def profile_lap(stage):
+    """処理段階の時間を記録する (profile_stages が False の場合は何もしない)"""
+    if stage_profiler is not None:
+        stage_profiler.lap(stage)
+
+
+def profile_count(name, value):
+    """フレームで扱った件数を記録する (profile_stages が False の場合は何もしない)"""
+    if stage_profiler is not None:
+        stage_profiler.count(name, value)
+
 def get_bone_chain_global_locations(armature_object):
     """
     アーマチュアオブジェクトの全てのボーンについて、
@@ -116,7 +314,259 @@ def get_2d_screen_coords(scene, world_coords, cam):
 
     return (screen_x, screen_y)
 
-def get_vertex_group_screen_coords(obj, vertex_group_name, scene, cam):
+class CameraProjector:
+    """
+    3D空間上のワールド座標の配列を、まとめてカメラのビューポート上の2D座標に変換する
+    (get_2d_screen_coords と同じ変換を行列演算で行う)
+
+    カメラの行列とレンダリング設定は作成時に読み込むため、フレームごとに作成する
+
+    Args:
+        scene (bpy.types.Scene): Blenderのシーンデータ
+        cam (bpy.types.Object): カメラオブジェクト
+    """
+
+    def __init__(self, scene, cam):
+        # ワールド座標 → カメラのローカル座標 (world_to_camera_view と同じ行列)
+        self.camera_matrix = np.array(cam.matrix_world.normalized().inverted(), dtype=np.float64)
+        self.view_frame = [np.array(v, dtype=np.float64) for v in cam.data.view_frame(scene=scene)[:3]]
+
+        # ビューポート座標 → スクリーン座標
+        render_scale = scene.render.resolution_percentage / 100
+        self.screen_width = scene.render.resolution_x * render_scale
+        self.screen_height = scene.render.resolution_y * render_scale
+
+        # カメラのタイプを取得
+        self.camera_type = cam.data.type
+
+    def project(self, world_coords):
+        """
+        ワールド座標の配列をスクリーン座標に変換する
+
+        Args:
+            world_coords (numpy.ndarray): (N, 3) の3Dワールド座標
+
+        Returns:
+            numpy.ndarray: (N, 2) の2D座標 (整数)
+                           ビューポートの外側でも座標を計算し、負の値も許容する
+        """
+        world_coords = np.asarray(world_coords, dtype=np.float64).reshape(-1, 3)
+        co_local = world_coords @ self.camera_matrix[:3, :3].T + self.camera_matrix[:3, 3]
+        z = -co_local[:, 2]
+
+        frame = self.view_frame
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.camera_type != 'ORTHO':
+                # 透視投影ではビューフレームを座標の深度に合わせて拡大する
+                scale = [-z / v[2] for v in frame]
+                min_x, max_x = frame[2][0] * scale[2], frame[1][0] * scale[1]
+                min_y, max_y = frame[1][1] * scale[1], frame[0][1] * scale[0]
+            else:
+                min_x, max_x = frame[2][0], frame[1][0]
+                min_y, max_y = frame[1][1], frame[0][1]
+
+            co_2d_x = (co_local[:, 0] - min_x) / (max_x - min_x)
+            co_2d_y = (co_local[:, 1] - min_y) / (max_y - min_y)
+
+        screen_coords = np.full((len(world_coords), 2), -1, dtype=np.int64)
+
+        if self.camera_type == 'PERSP':
+            # 透視投影の場合 (カメラの後ろにある場合は-1)
+            visible = z > 0
+        elif self.camera_type == 'ORTHO':
+            # 平行投影の場合
+            visible = np.ones(len(world_coords), dtype=bool)
+        else:
+            # 未知のカメラタイプの場合は-1
+            visible = np.zeros(len(world_coords), dtype=bool)
+
+        # round と同じく偶数丸めで整数化する
+        screen_coords[visible, 0] = np.rint(co_2d_x[visible] * self.screen_width)
+        screen_coords[visible, 1] = np.rint((1 - co_2d_y[visible]) * self.screen_height)  # Y座標を反転
+
+        return screen_coords
+
+# ボーンの順番のキャッシュ (ボーンの親子関係はフレームによって変わらない)
+_bone_order_cache = {}
+
+def get_bone_order(armature_object):
+    """
+    ルートボーンから順に末端ボーンまでたどった順番 (get_bone_chain_global_locations と同じ順番) でボーン名を取得する
+
+    Args:
+        armature_object (bpy.types.Object): アーマチュアオブジェクト
+
+    Returns:
+        list: ボーン名のリスト
+    """
+    cache_key = (armature_object.name, len(armature_object.pose.bones))
+    bone_order = _bone_order_cache.get(cache_key)
+    if bone_order is None:
+        bone_order = []
+
+        def traverse_bones(bone):
+            bone_order.append(bone.name)
+            for child in bone.children:
+                traverse_bones(child)
+
+        for root_bone in armature_object.pose.bones:
+            if not root_bone.parent:
+                traverse_bones(root_bone)
+        _bone_order_cache[cache_key] = bone_order
+    return bone_order
+
+# ボーンの子ボーン名のキャッシュ (ボーンの親子関係はフレームによって変わらない)
+_bone_children_cache = {}
+
+def get_bone_children(armature_object):
+    """
+    アーマチュアの全てのボーンについて、子ボーン名のリストを取得する
+
+    Args:
+        armature_object (bpy.types.Object): アーマチュアオブジェクト
+
+    Returns:
+        dict: ボーン名 → 子ボーン名のリスト の辞書
+    """
+    cache_key = (armature_object.name, len(armature_object.pose.bones))
+    children = _bone_children_cache.get(cache_key)
+    if children is None:
+        children = {
+            bone.name: [child.name for child in bone.children]
+            for bone in armature_object.pose.bones
+        }
+        _bone_children_cache[cache_key] = children
+    return children
+
+# 頂点グループごとの属する頂点番号のキャッシュ (頂点グループの割り当てはフレームによって変わらない)
+_vertex_group_members_cache = {}
+
+def get_mesh_vertex_group_members(obj):
+    """
+    メッシュの頂点を一度だけ走査し、全ての頂点グループについて (0より大きいウェイトで) 属する頂点番号を取得する
+
+    Args:
+        obj (bpy.types.Object): オブジェクト
+
+    Returns:
+        dict: 頂点グループのインデックス → 頂点番号の配列 (昇順) の辞書
+    """
+    cache_key = (obj.name, len(obj.data.vertices))
+    members = _vertex_group_members_cache.get(cache_key)
+    if members is None:
+        members = {group.index: [] for group in obj.vertex_groups}
+        for vertex in obj.data.vertices:
+            for group in vertex.groups:
+                if group.weight > 0 and group.group in members:
+                    members[group.group].append(vertex.index)
+        # 同じ頂点グループに重複して割り当てられていても1回だけにする
+        members = {index: np.unique(np.array(indices, dtype=np.int64)) for index, indices in members.items()}
+        _vertex_group_members_cache[cache_key] = members
+    return members
+
+def get_vertex_group_members(obj, vertex_group_index):
+    """
+    頂点グループに (0より大きいウェイトで) 属する頂点番号を取得する
+
+    Args:
+        obj (bpy.types.Object): オブジェクト
+        vertex_group_index (int): 頂点グループのインデックス
+
+    Returns:
+        numpy.ndarray: 頂点番号の配列 (昇順)
+    """
+    members = get_mesh_vertex_group_members(obj).get(vertex_group_index)
+    if members is None:
+        return np.empty(0, dtype=np.int64)
+    return members
+
+def get_mesh_vertex_groups_screen_coords(obj, vertex_group_names, scene, cam, projector=None, depsgraph=None,
+                                         excluded_fields=frozenset()):
+    """
+    メッシュの複数の頂点グループについて、属する頂点と辺のスクリーン座標とグローバル座標をまとめて取得する
+
+    評価後のメッシュの頂点座標の取得とスクリーン座標への変換は、頂点グループの数によらず一度だけ行う
+
+    Args:
+        obj (bpy.types.Object): オブジェクト
+        vertex_group_names (list): 頂点グループ名のリスト
+        scene (bpy.types.Scene): シーン
+        cam (bpy.types.Object): カメラ
+        projector (CameraProjector, optional): フレームごとに作成したスクリーン座標への変換. Defaults to None.
+        depsgraph (bpy.types.Depsgraph, optional): フレームごとに取得した depsgraph. Defaults to None.
+        excluded_fields (set, optional): 頂点と辺の情報のうち出力しないキー. Defaults to frozenset().
+
+    Returns:
+        dict: 頂点グループ名 → (頂点のリスト, 辺のリスト, (辺の数, 3) の辺のインデックスと両端の頂点の位置の配列) の辞書
+              (オブジェクトに存在する頂点グループのみ)
+    """
+    groups = []
+    for vertex_group_name in vertex_group_names:
+        if vertex_group_name not in obj.vertex_groups:
+            print(f"頂点グループ '{vertex_group_name}' はオブジェクト '{obj.name}' に存在しません。スキップします。")
+            continue
+        groups.append((vertex_group_name, get_vertex_group_topology(obj, obj.vertex_groups[vertex_group_name].index)))
+    if not groups:
+        return {}
+
+    if depsgraph is None:
+        # depsgraphを取得
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    # 評価後のメッシュデータを取得
+    evaluated_object = obj.evaluated_get(depsgraph)
+    evaluated_mesh = evaluated_object.data
+
+    # 変形後の頂点座標をまとめて取得
+    vertex_count = len(evaluated_mesh.vertices)
+    local_coords = np.empty(vertex_count * 3, dtype=np.float32)
+    evaluated_mesh.vertices.foreach_get("co", local_coords)
+    local_coords = local_coords.reshape(-1, 3)
+
+    # いずれかの頂点グループに属する頂点のみを取り出して、まとめてワールド座標とスクリーン座標に変換
+    used_vertices = np.unique(np.concatenate([members for _, (members, _, _) in groups]))
+    matrix_world = np.array(obj.matrix_world, dtype=np.float64)
+    world_coords = local_coords[used_vertices] @ matrix_world[:3, :3].T + matrix_world[:3, 3]
+
+    # スクリーン座標を出力しない場合 (カメラが無い場合など) は変換しない
+    if "screen_coords" not in excluded_fields:
+        if projector is None:
+            projector = CameraProjector(scene, cam)
+        vertex_screen_coords = projector.project(world_coords)
+
+    results = {}
+    for vertex_group_name, (members, edge_indices, edge_positions) in groups:
+        # 頂点グループの頂点の、変換した頂点の配列内の位置
+        positions = np.searchsorted(used_vertices, members)
+        screen_coord_list = vertex_screen_coords[positions].tolist() if "screen_coords" not in excluded_fields else None
+
+        # 出力するキーの値のみを作成する
+        vertex_fields = {}
+        if "vertex_index" not in excluded_fields:
+            vertex_fields["vertex_index"] = members.tolist()
+        if "screen_coords" not in excluded_fields:
+            vertex_fields["screen_coords"] = screen_coord_list
+        if "global_coords" not in excluded_fields:
+            vertex_fields["global_coords"] = world_coords[positions].astype(np.float32).tolist()
+        screen_coords = [dict(zip(vertex_fields, values)) for values in zip(*vertex_fields.values())] \
+            if vertex_fields else [{} for _ in range(len(members))]
+
+        # 辺のスクリーン座標も取得 (変形後の頂点座標を使用)
+        edge_fields = {}
+        if "edge_index" not in excluded_fields:
+            edge_fields["edge_index"] = edge_indices.tolist()
+        if "screen_coords" not in excluded_fields:
+            edge_fields["screen_coords"] = [
+                [screen_coord_list[v1_position], screen_coord_list[v2_position]]
+                for v1_position, v2_position in edge_positions.tolist()
+            ]
+        edge_screen_coords = [dict(zip(edge_fields, values)) for values in zip(*edge_fields.values())] \
+            if edge_fields else [{} for _ in range(len(edge_indices))]
+
+        results[vertex_group_name] = (screen_coords, edge_screen_coords, np.column_stack([edge_indices, edge_positions]))
+
+    return results
+
+def get_vertex_group_screen_coords(obj, vertex_group_name, scene, cam, projector=None, depsgraph=None):
     """
     特定の頂点グループに属する頂点のスクリーン座標とグローバル座標を取得する
 
@@ -125,116 +575,236 @@ def get_vertex_group_screen_coords(obj, vertex_group_name, scene, cam):
         vertex_group_name (str): 頂点グループ名
         scene (bpy.types.Scene): シーン
         cam (bpy.types.Object): カメラ
+        projector (CameraProjector, optional): フレームごとに作成したスクリーン座標への変換. Defaults to None.
+        depsgraph (bpy.types.Depsgraph, optional): フレームごとに取得した depsgraph. Defaults to None.
 
     Returns:
         list: スクリーン座標とグローバル座標のリスト
     """
-
-    if vertex_group_name not in obj.vertex_groups:
-        print(f"頂点グループ '{vertex_group_name}' はオブジェクト '{obj.name}' に存在しません。スキップします。")
+    results = get_mesh_vertex_groups_screen_coords(obj, [vertex_group_name], scene, cam, projector, depsgraph)
+    if vertex_group_name not in results:
         return [], [] # 頂点グループが存在しない場合は空のリストを返す
+    screen_coords, edge_screen_coords, _ = results[vertex_group_name]
+    return screen_coords, edge_screen_coords
 
-    vertex_group_index = obj.vertex_groups[vertex_group_name].index
-    screen_coords = []
+# 頂点グループの頂点と辺の構成のキャッシュ (フレームによって変わらない)
+_vertex_group_topology_cache = {}
 
-    # depsgraphを取得
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    # 評価後のメッシュデータを取得
-    evaluated_object = obj.evaluated_get(depsgraph)
-    evaluated_mesh = evaluated_object.data
+def get_vertex_group_topology(obj, vertex_group_index):
+    """
+    頂点グループに属する頂点番号と、両端が頂点グループに属する辺を取得する
 
-    for vertex in obj.data.vertices:
-        for group in vertex.groups:
-            if group.group == vertex_group_index and group.weight > 0:
-                # 変形後の頂点座標を取得
-                world_coords = obj.matrix_world @ evaluated_mesh.vertices[vertex.index].co 
-                screen_coord = get_2d_screen_coords(scene, world_coords, cam)
-                screen_coords.append({
-                    "vertex_index": vertex.index, 
-                    "screen_coords": screen_coord,
-                    "global_coords": list(world_coords) 
-                })
-                break # 同じ頂点が複数の頂点グループに属している場合、最初の頂点グループのみ処理する
-
-    # 辺のスクリーン座標も取得 (変形後の頂点座標を使用)
-    edge_screen_coords = []
-    for edge in obj.data.edges:
-        v1_index = edge.vertices[0]
-        v2_index = edge.vertices[1]
-        v1_screen_coord = None
-        v2_screen_coord = None
-
-        for coord in screen_coords:
-            if coord["vertex_index"] == v1_index:
-                v1_screen_coord = coord["screen_coords"]
-            if coord["vertex_index"] == v2_index:
-                v2_screen_coord = coord["screen_coords"]
-
-        if v1_screen_coord and v2_screen_coord:
-            edge_screen_coords.append({"edge_index": edge.index, "screen_coords": [v1_screen_coord, v2_screen_coord]})
+    Args:
+        obj (bpy.types.Object): オブジェクト
+        vertex_group_index (int): 頂点グループのインデックス
 
-    return screen_coords, edge_screen_coords
+    Returns:
+        tuple: (頂点番号の配列, 辺のインデックスの配列, (辺の数, 2) の両端の頂点の位置 (頂点番号の配列内の位置) の配列)
+    """
+    cache_key = (obj.name, vertex_group_index, len(obj.data.vertices), len(obj.data.edges))
+    topology = _vertex_group_topology_cache.get(cache_key)
+    if topology is None:
+        members = get_vertex_group_members(obj, vertex_group_index)
+
+        # 頂点番号 → 頂点番号の配列内の位置 の対応表で、両端が頂点グループに属する辺を選ぶ
+        edges = get_mesh_edges(obj)
+        member_position = np.full(len(obj.data.vertices), -1, dtype=np.int64)
+        member_position[members] = np.arange(len(members))
+        edge_positions = member_position[edges]
+        edge_indices = np.flatnonzero((edge_positions >= 0).all(axis=1))
+
+        topology = (members, edge_indices, edge_positions[edge_indices])
+        _vertex_group_topology_cache[cache_key] = topology
+    return topology
+
+# メッシュの辺の両端の頂点番号のキャッシュ (辺の構成はフレームによって変わらない)
+_mesh_edges_cache = {}
+
+def get_mesh_edges(obj):
+    """
+    メッシュの全ての辺の両端の頂点番号を取得する
+
+    Args:
+        obj (bpy.types.Object): メッシュオブジェクト
+
+    Returns:
+        numpy.ndarray: (辺の数, 2) の頂点番号の配列 (行番号が辺のインデックス)
+    """
+    cache_key = (obj.name, len(obj.data.edges))
+    edges = _mesh_edges_cache.get(cache_key)
+    if edges is None:
+        edges = np.empty(len(obj.data.edges) * 2, dtype=np.int64)
+        obj.data.edges.foreach_get("vertices", edges)
+        edges = edges.reshape(-1, 2)
+        _mesh_edges_cache[cache_key] = edges
+    return edges
+
+
+def get_frame_state_hash(scene, armature_object):
+    """
+    フレームの出力内容を決める状態 (ポーズ行列、カメラの行列とビューフレーム、レンダリング解像度、
+    シェイプキーの値、メッシュのワールド行列) のハッシュ値を取得する
+
+    Args:
+        scene (bpy.types.Scene): Blenderのシーンデータ
+        armature_object (bpy.types.Object): アーマチュアオブジェクト (無い場合は None)
+
+    Returns:
+        bytes: ハッシュ値
+    """
+    state = hashlib.blake2b(digest_size=16)
+
+    def add_values(values):
+        state.update(np.asarray(values, dtype=np.float32).tobytes())
+
+    if armature_object:
+        pose_bones = armature_object.pose.bones
+        matrices = np.empty(len(pose_bones) * 16, dtype=np.float32)
+        pose_bones.foreach_get("matrix", matrices)
+        state.update(matrices.tobytes())
+        add_values(armature_object.matrix_world)
+
+    camera_object = scene.camera
+    if camera_object:
+        add_values(camera_object.matrix_world)
+        add_values(camera_object.location)
+        add_values(camera_object.rotation_euler)
+        add_values([list(v) for v in camera_object.data.view_frame(scene=scene)])
+        add_values([camera_object.data.lens, scene.render.resolution_x, scene.render.resolution_y,
+                    scene.render.resolution_percentage])
+        state.update(camera_object.data.type.encode("utf-8"))
+
+    for obj in bpy.data.objects:
+        if obj.type == 'MESH':
+            add_values(obj.matrix_world)
+            if obj.data.shape_keys:
+                key_blocks = obj.data.shape_keys.key_blocks
+                values = np.empty(len(key_blocks), dtype=np.float32)
+                key_blocks.foreach_get("value", values)
+                state.update(values.tobytes())
 
+    return state.digest()
+
+def save_frame_reference(scene, frame, same_as):
+    """
+    フレームの内容の代わりに、同じ内容のフレームへの参照を保存する
+
+    Args:
+        scene (bpy.types.Scene): Blenderのシーンデータ
+        frame (int): 保存するフレーム番号
+        same_as (int): 同じ内容のフレームのフレーム番号
+    """
+    if animation_writer is not None:
+        animation_writer.add_reference(frame, same_as)
+        saved_frame_files[frame] = animation_writer.path
+    else:
+        json_file_path = os.path.join(get_output_folder(scene), f"{frame:04d}.json")
+        with open(json_file_path, "w", encoding="utf-8") as f:
+            json.dump({"same_as": same_as}, f)
+        saved_frame_files[frame] = json_file_path
+
+    duplicate_frames[frame] = same_as
+    print(f"フレーム {frame} はフレーム {same_as} と同じため、参照のみを保存しました。")
 
 def save_frame_data_core(scene, frame):
 
     # scene (bpy.types.Scene): Blenderのシーンデータ
     # frame (int): 保存するフレーム番号
 
+    global frame_rig, previous_frame
 
     # フレーム番号を設定
     scene.frame_set(frame)
+    profile_lap("frame_set")
 
     # オブジェクトの状態を更新
     bpy.context.view_layer.update()
+    profile_lap("view_layer_update")
 
     # データを格納する辞書
     output_data = {}
 
+    # スクリーン座標への変換 (カメラの行列とレンダリング設定はフレームごとに一度だけ読み込む)
+    # シーンにカメラが無い場合は、スクリーン座標を出力しない
+    if scene.camera is not None:
+        projector = CameraProjector(scene, scene.camera)
+        frame_excluded_fields = excluded_fields
+    else:
+        projector = None
+        frame_excluded_fields = excluded_fields | {"screen_coords", "tail_screen_coords"}
+
     # アーマチュアオブジェクトを取得
     armature_object = None
     for obj in bpy.data.objects:
         if obj.type == 'ARMATURE':
             armature_object = obj
             break
+    profile_lap("setup")
+
+    # 直前に保存したフレームと状態が同じ場合は、参照のみを保存する
+    if dedupe_frames:
+        state_hash = get_frame_state_hash(scene, armature_object)
+        profile_lap("state_hash")
+        if previous_frame is not None and previous_frame["hash"] == state_hash:
+            save_frame_reference(scene, scene.frame_current, previous_frame["frame"])
+            profile_lap("write")
+            return
 
     # アーマチュアの情報
     if armature_object:
-        # ボーンのグローバル座標を取得
-        bone_data = get_bone_chain_global_locations(armature_object)
-
-        # 各ボーンの2Dスクリーン座標とhead/tailのグローバル座標を追加
-        for bone_name, bone_info in bone_data.items():
-            bone = armature_object.pose.bones[bone_name]
-
-            # ボーンのhead位置をワールド座標に変換
-            head_world_coords = armature_object.matrix_world @ bone.head
-
-            # ボーンのtail位置をワールド座標に変換
-            tail_world_coords = armature_object.matrix_world @ bone.tail
+        # ボーンの順番 (ルートボーンから末端ボーンまで) は最初のフレームで一度だけ取得する
+        bone_names = get_bone_order(armature_object)
+        if bone_name_mapping is not None:
+            # ボーン名変換情報に含まれるボーンのみを出力する
+            bone_names = [bone_name for bone_name in bone_names if bone_name in bone_name_mapping]
+
+        # 各ボーンの2Dスクリーン座標とhead/tailのグローバル座標を追加 (出力しないものは計算しない)
+        # head/tail をまとめてワールド座標に変換し、一度にスクリーン座標に変換する
+        pose_bones = [armature_object.pose.bones[bone_name] for bone_name in bone_names]
+        use_head = not {"global_coords", "screen_coords"} <= frame_excluded_fields
+        use_tail = not {"tail_global_coords", "tail_screen_coords"} <= frame_excluded_fields
+        head_world_coords = [armature_object.matrix_world @ bone.head for bone in pose_bones] if use_head else []
+        tail_world_coords = [armature_object.matrix_world @ bone.tail for bone in pose_bones] if use_tail else []
+
+        projected_coords = []
+        if "screen_coords" not in frame_excluded_fields:
+            projected_coords += head_world_coords
+        if "tail_screen_coords" not in frame_excluded_fields:
+            projected_coords += tail_world_coords
+        if projected_coords:
+            screen_coords = projector.project(np.array(projected_coords, dtype=np.float64)).tolist()
+        else:
+            screen_coords = []
+        head_screen_coords = screen_coords[:len(bone_names)] if "screen_coords" not in frame_excluded_fields else None
+        tail_screen_coords = screen_coords[-len(bone_names):] if "tail_screen_coords" not in frame_excluded_fields else None
 
-            # 2Dスクリーン座標を取得 (headのみ)
-            screen_coords = get_2d_screen_coords(scene, head_world_coords, scene.camera)
+        # 子ボーンの情報 (親子関係は最初のフレームで一度だけ取得する)
+        bone_children = get_bone_children(armature_object) if "children" not in excluded_fields else None
 
-            # tailの2Dスクリーン座標を取得
-            tail_screen_coords = get_2d_screen_coords(scene, tail_world_coords, scene.camera)
+        bone_data = {}
+        for i, bone_name in enumerate(bone_names):
+            bone_info = {}
 
             # スクリーン座標とグローバル座標を辞書に追加
-            bone_info["global_coords"] = list(head_world_coords)  
-            bone_info["screen_coords"] = screen_coords 
-            bone_info["tail_global_coords"] = list(tail_world_coords)
-            bone_info["tail_screen_coords"] = tail_screen_coords
-
-        # 子ボーンの情報を追加
-        for bone_name, bone_info in bone_data.items():
-            bone = armature_object.pose.bones[bone_name] # ループ内でbone変数を更新
-            bone_info["children"] = [] # ここでchildrenを追加
-            for child in bone.children: 
-                bone_info["children"].append(child.name)
+            if "global_coords" not in excluded_fields:
+                bone_info["global_coords"] = list(head_world_coords[i])
+            if head_screen_coords is not None:
+                bone_info["screen_coords"] = head_screen_coords[i]
+            if "tail_global_coords" not in excluded_fields:
+                bone_info["tail_global_coords"] = list(tail_world_coords[i])
+            if tail_screen_coords is not None:
+                bone_info["tail_screen_coords"] = tail_screen_coords[i]
+            if bone_children is not None:
+                bone_info["children"] = bone_children[bone_name] # 子ボーン名は変換しない (json_trim.py と同じ)
+
+            # ボーン名変換情報がある場合は変換後のボーン名で出力する
+            bone_data[bone_name_mapping[bone_name] if bone_name_mapping is not None else bone_name] = bone_info
 
         output_data["bones"] = bone_data
+        profile_count("bones", len(bone_data))
     else:
         print("アーマチュアが見つかりません。")
+    profile_lap("bones")
 
     # シーン内のアクティブカメラを取得
     camera_object = scene.camera
@@ -245,20 +815,48 @@ def save_frame_data_core(scene, frame):
         resolution_x = scene.render.resolution_x * scene.render.resolution_percentage / 100
         resolution_y = scene.render.resolution_y * scene.render.resolution_percentage / 100
 
-        output_data["camera"] = get_camera_info(camera_object, resolution_x, resolution_y)
+        camera_data = get_camera_info(camera_object, resolution_x, resolution_y)
+        output_data["camera"] = {key: value for key, value in camera_data.items() if key not in excluded_fields}
+    profile_lap("camera")
 
     # 特定の頂点グループのスクリーン座標を取得
     vertex_group_names = ["group1", "group2", "group3"] # 対象の頂点グループ名のリスト
 
+    # 頂点グループの辺の構成 (npz形式で保存する場合と、rig を分けて保存する場合に使用)
+    topology = {}
+
+    # 評価後のメッシュを取得するための depsgraph (フレームごとに一度だけ取得する)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
     for obj in bpy.data.objects:
         if obj.type == 'MESH' and obj.vertex_groups:  # メッシュオブジェクトかつ頂点グループを持つ場合のみ
-            for vertex_group_name in vertex_group_names:
-                vertex_screen_coords, edge_screen_coords = get_vertex_group_screen_coords(obj, vertex_group_name, scene, scene.camera)
-                if vertex_screen_coords: # 頂点グループが存在する場合のみJSONに追加
-                    output_data[vertex_group_name] = {
-                        "vertices": vertex_screen_coords,
-                        "edges": edge_screen_coords
-                    }
+            # メッシュごとに、全ての頂点グループの座標をまとめて取得する
+            group_results = get_mesh_vertex_groups_screen_coords(obj, vertex_group_names, scene, scene.camera, projector, depsgraph,
+                                                                 frame_excluded_fields)
+            for vertex_group_name, (vertex_screen_coords, edge_screen_coords, edges) in group_results.items():
+                if not vertex_screen_coords: # 頂点グループに頂点がある場合のみJSONに追加
+                    continue
+                if vertex_group_name not in output_data:
+                    output_data[vertex_group_name] = {"vertices": [], "edges": []}
+                    topology[vertex_group_name] = {"edges": []}
+
+                # 複数のメッシュに同じ名前の頂点グループがある場合は、頂点と辺を後ろに追加していく
+                # (vertex_index と edge_index はメッシュごとの番号のまま)
+                group_data = output_data[vertex_group_name]
+                edges[:, 1:] += len(group_data["vertices"])
+                group_data["vertices"].extend(vertex_screen_coords)
+                group_data["edges"].extend(edge_screen_coords)
+                if "edges" not in excluded_fields:  # 辺を出力しない場合は辺の構成も保存しない
+                    topology[vertex_group_name]["edges"].extend(edges.tolist())
+                profile_count("vertices", len(vertex_screen_coords))
+                profile_count("edges", len(edge_screen_coords))
+
+    # 出力しないキーに "vertices" / "edges" が含まれている場合は、全てのメッシュの追加後に削除する
+    for vertex_group_name in topology:
+        for key in ("vertices", "edges"):
+            if key in excluded_fields:
+                del output_data[vertex_group_name][key]
+    profile_lap("vertex_groups")
 
     # シェイプキーの情報 (export_shape_keys が True の場合のみ)
     if armature_object and export_shape_keys:
@@ -268,59 +866,171 @@ def save_frame_data_core(scene, frame):
                 if obj.data.shape_keys:
                     obj_shape_key_data = {}
                     for shape_key in obj.data.shape_keys.key_blocks:
-                        if shape_key.name != 'Basis':
+                        if shape_key.name != 'Basis' and shape_key.name not in excluded_fields:
                             obj_shape_key_data[shape_key.name] = shape_key.value
                     # メッシュオブジェクトが複数ある場合はオブジェクト名を追加
                     if len(shape_key_data) > 0:
-                        shape_key_data[f"shape_keys_{obj.name}"] = obj_shape_key_data
+                        if f"shape_keys_{obj.name}" not in excluded_fields:
+                            shape_key_data[f"shape_keys_{obj.name}"] = obj_shape_key_data
                     else:
                         shape_key_data = obj_shape_key_data  # 最初のオブジェクトはそのまま
         if shape_key_data:  # shape_key_dataが空でない場合のみ出力に追加
             output_data["shape_keys"] = shape_key_data
-
-    # レンダー出力パスを取得 (シーンの設定を使用)
-    output_path = scene.render.filepath
-
-    # 出力パスが設定されていない場合は、ブレンドファイルと同じディレクトリを使用
-    if not output_path:
-        output_path = bpy.path.abspath("//")
+    profile_lap("shape_keys")
 
     # フレーム番号を取得
     frame = scene.frame_current
 
-    # ファイル名と拡張子を取得
-    file_name, file_ext = os.path.splitext(os.path.basename(output_path))
+    # 進捗状況の表示用
+    total_frames = scene.frame_end - scene.frame_start + 1
+
+    if dedupe_frames:
+        previous_frame = {"hash": state_hash, "frame": frame}
+
+    if animation_writer is not None:
+        # npz / jsonl 形式の場合は、まとめて保存するファイルに追加する
+        animation_writer.add_frame(frame, output_data, topology)
+        profile_lap("write")
+        saved_frame_files[frame] = animation_writer.path
+        print(f"フレーム {frame} / {total_frames} のデータを '{animation_writer.path}' に追加しました。")
+        return
 
     # JSONファイル名を作成
     json_file_name = f"{frame:04d}.json"
 
     # JSONファイルパスを作成
-    if json_output_folder:
-        # json_output_folder が指定されている場合は、そのフォルダを使用する
-        json_file_path = os.path.join(json_output_folder, json_file_name)
+    json_file_path = os.path.join(get_output_folder(scene), json_file_name)
+
+    if split_rig:
+        # rig は最初のフレームで一度だけ保存し、フレームごとには変化する値のみを保存する
+        if frame_rig is None:
+            frame_rig = frame_store.create_rig(output_data, topology)
+            write_rig(os.path.join(get_output_folder(scene), frame_store.RIG_FILE), frame_rig)
+        record = frame_store.split_frame_record(output_data, frame_rig)
+        with open(json_file_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
     else:
-        # json_output_folder が指定されていない場合は、これまで通りのパスを使用する
-        json_file_path = os.path.join(os.path.dirname(output_path), json_file_name)
+        # JSONデータを出力
+        with open(json_file_path, "w", encoding="utf-8") as f:  # エンコーディングを指定
+            json.dump(output_data, f, indent=4, ensure_ascii=False)  # ensure_ascii=False を追加
+    profile_lap("write")
 
-    # JSONデータを出力
-    with open(json_file_path, "w", encoding="utf-8") as f:  # エンコーディングを指定
-        json.dump(output_data, f, indent=4, ensure_ascii=False)  # ensure_ascii=False を追加
+    saved_frame_files[frame] = json_file_path
 
     # 進捗状況を表示
-    total_frames = scene.frame_end - scene.frame_start + 1
     print(f"フレーム {frame} / {total_frames} のデータを '{json_file_path}' に保存しました。")
 
+def write_rig(rig_path, rig):
+    """
+    rig をJSONファイルに保存する
+
+    複数の Blender が同じフォルダに保存する場合 (bone_info_save_launcher.py) に
+    書き込み途中のファイルが読み込まれないよう、一時ファイルに書き込んでから置き換える
+
+    Args:
+        rig_path (str): 保存するJSONファイルのパス
+        rig (dict): frame_store.create_rig で作成した rig
+    """
+    temp_path = f"{rig_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(rig, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, rig_path)
+
+def get_output_folder(scene):
+    """
+    フレームデータを保存するフォルダを取得する
+
+    Args:
+        scene (bpy.types.Scene): Blenderのシーンデータ
+
+    Returns:
+        str: 保存先のフォルダ
+    """
+    if json_output_folder:
+        # json_output_folder が指定されている場合は、そのフォルダを使用する
+        return json_output_folder
+
+    # レンダー出力パスを取得 (シーンの設定を使用)
+    output_path = scene.render.filepath
+
+    # 出力パスが設定されていない場合は、ブレンドファイルと同じディレクトリを使用
+    if not output_path:
+        output_path = bpy.path.abspath("//")
+
+    return os.path.dirname(output_path)
+
 def render_and_save_data(scene):
     """
     レンダリング後のフレームデータを保存する
     """
-    save_frame_data_core(scene, scene.frame_current)
+    save_frame_data(scene, scene.frame_current)
 
 def save_frame_data(scene, frame):
     """
-    指定されたフレームのデータを保存する
+    指定されたフレームのデータを保存する (profile_stages が True の場合は処理段階の時間も記録する)
     """
-    save_frame_data_core(scene, frame)
+    if stage_profiler is None:
+        save_frame_data_core(scene, frame)
+        return
+
+    stage_profiler.start_frame(frame)
+    try:
+        save_frame_data_core(scene, frame)
+    finally:
+        stage_profiler.end_frame()
+
+
+def parse_arguments():
+    """
+    コマンドライン引数を解析する
+
+    blender -b file.blend --python bone_info_save.py -- --frame_start 1 --frame_end 100
+    のように、"--" 以降の引数をスクリプトの引数として扱う
+
+    Returns:
+        argparse.Namespace: 解析結果 (指定されていない項目は None)
+    """
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(description="ボーン情報などをフレームごとにJSONとして保存する")
+    parser.add_argument("--frame_start", type=int, help="保存を開始するフレーム番号 (指定しない場合はシーンの設定)")
+    parser.add_argument("--frame_end", type=int, help="保存を終了するフレーム番号 (指定しない場合はシーンの設定)")
+    parser.add_argument("--frame_step", type=int, help="フレームの間隔 (指定しない場合はシーンの設定)")
+    parser.add_argument("--output_dir", help="JSONファイルを保存するフォルダ (指定しない場合は json_output_folder)")
+    parser.add_argument("--output_format", choices=["json", "npz", "jsonl"], help="出力形式 (指定しない場合は output_format)")
+    parser.add_argument("--exclude_keys_file", help="出力しないキーを記述したテキストファイルのパス (指定しない場合は exclude_keys_file)")
+    parser.add_argument("--csv_path", help="ボーン名変換情報を記述したCSVファイルのパス (指定しない場合は bone_name_csv_path)")
+    parser.add_argument("--split_rig", action="store_true", default=None,
+                        help="フレームによって変わらない情報を rig として分けて保存する (指定しない場合は split_rig)")
+    parser.add_argument("--dedupe_frames", action="store_true", default=None,
+                        help="直前のフレームと同じ内容のフレームは参照のみを保存する (指定しない場合は dedupe_frames)")
+    parser.add_argument("--manifest", help="保存したフレームの一覧 (マニフェスト) を出力するJSONファイルのパス")
+    parser.add_argument("--profile", action="store_true", default=None,
+                        help="処理段階ごとの時間を記録し、最後に集計結果を表示する (指定しない場合は profile_stages)")
+    parser.add_argument("--profile_output", help="処理段階ごとの時間の集計結果を保存するJSONファイルのパス (指定しない場合は profile_output_path)")
+    return parser.parse_args(argv)
+
+def write_manifest(scene, manifest_path):
+    """
+    保存したフレームの一覧とシーンの設定をマニフェストとしてJSONに出力する
+
+    Args:
+        scene (bpy.types.Scene): Blenderのシーンデータ
+        manifest_path (str): マニフェストを出力するJSONファイルのパス
+    """
+    manifest = {
+        "frame_start": scene.frame_start,
+        "frame_end": scene.frame_end,
+        "frame_step": scene.frame_step,
+        "fps": scene.render.fps / scene.render.fps_base,
+        "frames": [
+            dict({"frame": frame, "file": os.path.basename(json_file_path)},
+                 **({"same_as": duplicate_frames[frame]} if frame in duplicate_frames else {}))
+            for frame, json_file_path in sorted(saved_frame_files.items())
+        ],
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
 
 
 def main():
@@ -328,8 +1038,55 @@ def main():
     メイン関数: レンダリングモードまたはフレーム保存モードを実行する
     """
 
+    global json_output_folder, output_format, animation_writer, split_rig, frame_rig, dedupe_frames, previous_frame
+    global exclude_keys_file, bone_name_csv_path, excluded_fields, bone_name_mapping
+    global profile_stages, profile_output_path, stage_profiler
+
     scene = bpy.context.scene
 
+    # コマンドライン引数でフレーム範囲や保存先が指定された場合はそちらを使用する
+    args = parse_arguments()
+    if args.frame_start is not None:
+        scene.frame_start = args.frame_start
+    if args.frame_end is not None:
+        scene.frame_end = args.frame_end
+    if args.frame_step is not None:
+        scene.frame_step = args.frame_step
+    if args.output_dir:
+        json_output_folder = args.output_dir
+        os.makedirs(json_output_folder, exist_ok=True)
+
+    if args.output_format:
+        output_format = args.output_format
+    if args.split_rig is not None:
+        split_rig = args.split_rig
+    if args.dedupe_frames is not None:
+        dedupe_frames = args.dedupe_frames
+    if args.profile is not None:
+        profile_stages = args.profile
+    if args.profile_output:
+        profile_output_path = args.profile_output
+    stage_profiler = StageProfiler() if profile_stages or profile_output_path else None
+    frame_rig = None
+    previous_frame = None
+
+    # 出力しないキーとボーン名変換情報を読み込む (json_trim.py と同じ形式)
+    if args.exclude_keys_file:
+        exclude_keys_file = args.exclude_keys_file
+    if args.csv_path:
+        bone_name_csv_path = args.csv_path
+    excluded_fields = frozenset(json_trim.load_exclude_keys(exclude_keys_file)) if exclude_keys_file else frozenset()
+    bone_name_mapping = json_trim.load_bone_name_mapping(bone_name_csv_path) if bone_name_csv_path else None
+
+    if output_format in ("npz", "jsonl"):
+        # 全フレームを1つのファイルにまとめて保存する
+        container_path = os.path.join(get_output_folder(scene), f"animation_{scene.frame_start:04d}-{scene.frame_end:04d}.{output_format}")
+        fps = scene.render.fps / scene.render.fps_base
+        if output_format == "npz":
+            animation_writer = frame_store.AnimationContainerWriter(container_path, fps)
+        else:
+            animation_writer = frame_store.JsonLinesWriter(container_path, fps, split_rig=split_rig)
+
     if rendering_mode:
         # レンダリングモード
         bpy.app.handlers.render_post.append(render_and_save_data)
@@ -344,6 +1101,21 @@ def main():
         for frame in range(start_frame, end_frame + 1, frame_step):
             save_frame_data(scene, frame)
 
+    if animation_writer is not None:
+        animation_writer.close()
+        print(f"全フレームのデータを '{animation_writer.path}' に保存しました。")
+        animation_writer = None
+
+    if args.manifest:
+        write_manifest(scene, args.manifest)
+
+    if stage_profiler is not None:
+        stage_profiler.print_report()
+        if profile_output_path:
+            stage_profiler.write_report(profile_output_path)
+            print(f"処理段階ごとの時間を '{profile_output_path}' に保存しました。")
+        stage_profiler = None
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def split_frames(frame_start, frame_end, frame_step, shard_count):
+    """
+    フレーム範囲を連続した区間に分割する
+
+    Args:
+        frame_start (int): 開始フレーム番号
+        frame_end (int): 終了フレーム番号
+        frame_step (int): フレームの間隔
+        shard_count (int): 分割数
+
+    Returns:
+        list: 各区間の (開始フレーム番号, 終了フレーム番号) のリスト
+    """
+    frames = list(range(frame_start, frame_end + 1, frame_step))
+    shard_count = max(1, min(shard_count, len(frames)))
+
+    shards = []
+    for i in range(shard_count):
+        # 各区間のフレーム数がほぼ同じになるように分割する
+        begin = len(frames) * i // shard_count
+        end = len(frames) * (i + 1) // shard_count
+        if begin < end:
+            shards.append((frames[begin], frames[end - 1]))
+    return shards
+
+
+def start_shard(shard, blender_path, blend_file, script_path, output_dir, frame_step, work_dir, script_args=()):
+    """
+    1区間分のフレームを保存する Blender をバックグラウンドで起動する
+
+    Args:
+        shard (dict): 区間の情報 (index, frame_start, frame_end)
+        blender_path (str): Blender の実行ファイルのパス
+        blend_file (str): blendファイルのパス
+        script_path (str): bone_info_save.py のパス
+        output_dir (str): JSONファイルを保存するフォルダ
+        frame_step (int): フレームの間隔
+        work_dir (str): 区間ごとのマニフェストとログを保存するフォルダ
+        script_args (list, optional): bone_info_save.py にそのまま渡す追加の引数 (--output_format など). Defaults to ().
+
+    Returns:
+        subprocess.Popen: 起動したプロセス
+    """
+    shard["manifest"] = os.path.join(work_dir, f"shard_{shard['index']:03d}.json")
+    shard["log"] = os.path.join(work_dir, f"shard_{shard['index']:03d}.log")
+
+    # 前回の試行で出力されたマニフェストは削除しておく
+    if os.path.exists(shard["manifest"]):
+        os.remove(shard["manifest"])
+
+    command = [
+        blender_path, "-b", blend_file,
+        "--python-exit-code", "1",
+        "--python", script_path,
+        "--",
+        "--frame_start", str(shard["frame_start"]),
+        "--frame_end", str(shard["frame_end"]),
+        "--frame_step", str(frame_step),
+        "--output_dir", output_dir,
+        "--manifest", shard["manifest"],
+        *script_args,
+    ]
+    log_file = open(shard["log"], "w", encoding="utf-8")
+    process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+    log_file.close()  # 子プロセス側でファイルは開いたままになる
+    return process
+
+
+def load_shard_manifest(shard):
+    """
+    区間のマニフェストを読み込む (全てのフレームが保存されていない場合は None)
+
+    Args:
+        shard (dict): 区間の情報
+
+    Returns:
+        dict or None: マニフェスト
+    """
+    try:
+        with open(shard["manifest"], "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    expected_frames = set(range(shard["frame_start"], shard["frame_end"] + 1, shard["frame_step"]))
+    saved_frames = {entry["frame"] for entry in manifest["frames"]}
+    if not expected_frames <= saved_frames:
+        return None
+    return manifest
+
+
+def run_shards(blend_file, output_dir, frame_start, frame_end, frame_step=1, shard_count=None,
+               blender_path="blender", script_path=None, retries=2, script_args=()):
+    """
+    フレーム範囲を分割し、複数の Blender で並列に bone_info_save.py を実行する
+
+    全ての区間が終了したら、区間ごとのマニフェストを output_dir/manifest.json にまとめる
+    (.npz / .jsonl 形式の場合、フレームのファイルは区間ごとに保存したままにする。frame_store.list_frames に output_dir を渡すと全ての区間のフレームを読み込める)
+
+    Args:
+        blend_file (str): blendファイルのパス
+        output_dir (str): JSONファイルを保存するフォルダ
+        frame_start (int): 開始フレーム番号
+        frame_end (int): 終了フレーム番号
+        frame_step (int, optional): フレームの間隔. Defaults to 1.
+        shard_count (int, optional): 分割数 (指定しない場合はCPUコア数). Defaults to None.
+        blender_path (str, optional): Blender の実行ファイルのパス. Defaults to "blender".
+        script_path (str, optional): bone_info_save.py のパス (指定しない場合はこのスクリプトと同じフォルダ). Defaults to None.
+        retries (int, optional): 失敗した区間を再実行する回数. Defaults to 2.
+        script_args (list, optional): 各区間の bone_info_save.py にそのまま渡す追加の引数 (--output_format など). Defaults to ().
+
+    Returns:
+        list: 最後まで失敗した区間のリスト
+    """
+    if shard_count is None:
+        shard_count = os.cpu_count() or 1
+    if script_path is None:
+        script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bone_info_save.py")
+
+    os.makedirs(output_dir, exist_ok=True)
+    work_dir = os.path.join(output_dir, "_shards")
+    os.makedirs(work_dir, exist_ok=True)
+
+    shards = [
+        {"index": i, "frame_start": start, "frame_end": end, "frame_step": frame_step, "attempts": 0}
+        for i, (start, end) in enumerate(split_frames(frame_start, frame_end, frame_step, shard_count))
+    ]
+
+    pending = list(shards)
+    failed = []
+    while pending:
+        # 未完了の区間をまとめて起動し、全て終了するまで待つ
+        running = []
+        for shard in pending:
+            shard["attempts"] += 1
+            print(f"区間 {shard['index']} (フレーム {shard['frame_start']} - {shard['frame_end']}) "
+                  f"を開始します ({shard['attempts']} 回目)。")
+            running.append((shard, start_shard(shard, blender_path, blend_file, script_path,
+                                               output_dir, frame_step, work_dir, script_args)))
+
+        pending = []
+        for shard, process in running:
+            return_code = process.wait()
+            shard["result"] = load_shard_manifest(shard) if return_code == 0 else None
+            if shard["result"] is not None:
+                print(f"区間 {shard['index']} が完了しました。")
+            elif shard["attempts"] <= retries:
+                print(f"区間 {shard['index']} が失敗しました (終了コード: {return_code})。再実行します。ログ: {shard['log']}")
+                pending.append(shard)
+            else:
+                print(f"区間 {shard['index']} が失敗しました (終了コード: {return_code})。ログ: {shard['log']}")
+                failed.append(shard)
+
+    write_merged_manifest(output_dir, shards, frame_start, frame_end, frame_step)
+    return failed
+
+
+def write_merged_manifest(output_dir, shards, frame_start, frame_end, frame_step):
+    """
+    区間ごとのマニフェストを1つにまとめて output_dir/manifest.json に出力する
+
+    Args:
+        output_dir (str): JSONファイルを保存したフォルダ
+        shards (list): 区間の情報のリスト
+        frame_start (int): 開始フレーム番号
+        frame_end (int): 終了フレーム番号
+        frame_step (int): フレームの間隔
+    """
+    frames = []
+    fps = None
+    for shard in shards:
+        result = shard.get("result")
+        if result:
+            frames.extend(result["frames"])
+            fps = result.get("fps", fps)
+
+    manifest = {
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "frame_step": frame_step,
+        "fps": fps,
+        "frames": sorted(frames, key=lambda entry: entry["frame"]),
+        "failed_shards": [
+            {"frame_start": shard["frame_start"], "frame_end": shard["frame_end"], "log": shard["log"]}
+            for shard in shards if not shard.get("result")
+        ],
+    }
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, ensure_ascii=False)
+    print(f"マニフェストを '{manifest_path}' に保存しました。")
+
+
+def build_script_args(args, extra_args=()):
+    """
+    各区間の bone_info_save.py に渡す出力形式などの引数を作成する
+
+    Args:
+        args (argparse.Namespace): このスクリプトの引数の解析結果
+        extra_args (list, optional): "--" 以降に指定された、そのまま渡す引数. Defaults to ().
+
+    Returns:
+        list: bone_info_save.py に渡す引数のリスト
+    """
+    script_args = []
+    if args.output_format:
+        script_args += ["--output_format", args.output_format]
+    # Blender は同じ作業フォルダで起動するが、念のため絶対パスにして渡す
+    if args.exclude_keys_file:
+        script_args += ["--exclude_keys_file", os.path.abspath(args.exclude_keys_file)]
+    if args.csv_path:
+        script_args += ["--csv_path", os.path.abspath(args.csv_path)]
+    if args.split_rig:
+        script_args.append("--split_rig")
+    if args.dedupe_frames:
+        script_args.append("--dedupe_frames")
+    return script_args + list(extra_args)
+
+
+if __name__ == "__main__":
+    # "--" 以降の引数は各区間の bone_info_save.py にそのまま渡す
+    argv = sys.argv[1:]
+    extra_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    argv = argv[:argv.index("--")] if "--" in argv else argv
+
+    # 引数パーサーの設定
+    parser = argparse.ArgumentParser(
+        description="フレーム範囲を分割し、複数のバックグラウンド Blender で bone_info_save.py を並列に実行する",
+        epilog="\"--\" 以降の引数は、各区間の bone_info_save.py にそのまま渡します (例: -- --profile)")
+    parser.add_argument("-f", "--blend_file", required=True, help="blendファイルのパス")
+    parser.add_argument("-o", "--output_dir", required=True, help="JSONファイルを保存するフォルダ")
+    parser.add_argument("--frame_start", type=int, required=True, help="開始フレーム番号")
+    parser.add_argument("--frame_end", type=int, required=True, help="終了フレーム番号")
+    parser.add_argument("--frame_step", type=int, help="フレームの間隔", default=1)
+    parser.add_argument("-n", "--shards", type=int, help="分割数 (同時に起動する Blender の数、指定しない場合はCPUコア数)", default=None)
+    parser.add_argument("--blender", help="Blender の実行ファイルのパス", default="blender")
+    parser.add_argument("--script", help="bone_info_save.py のパス (指定しない場合はこのスクリプトと同じフォルダ)", default=None)
+    parser.add_argument("--retries", type=int, help="失敗した区間を再実行する回数", default=2)
+    # 以下は各区間の bone_info_save.py に渡す (指定しない場合は bone_info_save.py 冒頭の設定)
+    parser.add_argument("--output_format", choices=["json", "npz", "jsonl"], help="出力形式")
+    parser.add_argument("--exclude_keys_file", help="出力しないキーを記述したテキストファイルのパス")
+    parser.add_argument("--csv_path", help="ボーン名変換情報を記述したCSVファイルのパス")
+    parser.add_argument("--split_rig", action="store_true", help="フレームによって変わらない情報を rig として分けて保存する")
+    parser.add_argument("--dedupe_frames", action="store_true", help="直前のフレームと同じ内容のフレームは参照のみを保存する")
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    failed_shards = run_shards(args.blend_file, args.output_dir, args.frame_start, args.frame_end,
+                               args.frame_step, args.shards, args.blender, args.script, args.retries,
+                               build_script_args(args, extra_args))
+    print(f"処理時間: {time.time() - start_time:.1f} 秒")
+
+    if failed_shards:
+        print(f"{len(failed_shards)} 個の区間が失敗しました。")
+        sys.exit(1)
@@ -4,13 +4,63 @@ import tkinter as tk
 from tkinter import filedialog
 from PIL import Image, ImageTk, ImageDraw
 import argparse
+import builtins
+import contextlib
 import os
-import re
+import shutil
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 # bone_drawing_functions.py から描画関数をインポート
 from bone_drawing_functions import *  
+import frame_store
+
+class FrameCache:
+    """
+    最近使った順に決まった数の値を保持するキャッシュ (LRU、別スレッドからも使用できる)
+
+    Args:
+        capacity (int): 保持する値の数
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """値を取得する (無い場合は None)"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """値を追加する (保持する数を超えた場合は最も古く使った値を削除する)"""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
 
 class BoneViewer:
+    # 再生・スライダー移動時に先読みするフレーム数
+    prefetch_count = 8
+
     def __init__(self, master):
         self.master = master
         master.title("Bone Viewer")
@@ -19,11 +69,12 @@ class BoneViewer:
         self.max_canvas_width = 800
         self.max_canvas_height = 800
 
-        # JSONファイルパス
+        # JSONファイルパス (フォルダ、.npz / .jsonl ファイルも指定可能)
         self.json_path = tk.StringVar()
         tk.Label(master, text="JSONファイルパス:").grid(row=0, column=0)
         tk.Entry(master, textvariable=self.json_path, width=50).grid(row=0, column=1)
         tk.Button(master, text="参照", command=self.browse_json).grid(row=0, column=2)
+        tk.Button(master, text="フォルダ", command=self.browse_json_folder).grid(row=0, column=3)
 
         # 描画方法JSONファイルパス
         self.drawing_instructions_path = tk.StringVar()
@@ -36,17 +87,51 @@ class BoneViewer:
 
         # キャンバス
         self.canvas = tk.Canvas(master, width=self.max_canvas_width, height=self.max_canvas_height)
-        self.canvas.grid(row=3, column=0, columnspan=3)
+        self.canvas.grid(row=3, column=0, columnspan=4)
+
+        # タイムライン (再生/停止ボタン、フレームのスライダー、フレーム名)
+        self.play_button = tk.Button(master, text="再生", width=6, command=self.toggle_play)
+        self.play_button.grid(row=4, column=0)
+        self.frame_slider = tk.Scale(master, from_=0, to=0, orient=tk.HORIZONTAL, showvalue=False,
+                                     command=lambda value: self.show_frame(int(float(value))))
+        self.frame_slider.grid(row=4, column=1, columnspan=2, sticky="ew")
+        self.frame_label = tk.Label(master, text="")
+        self.frame_label.grid(row=4, column=3)
 
         # 画像データ
         self.image = None
         self.photo_image = None
 
+        # 表示中のフレームの一覧 (frame_store.list_frames を参照) と描画プラン
+        self.source_path = None
+        self.frames = []
+        self.frame_index = 0
+        self.displayed = None
+        self.render_plan = None
+        self.fps = 30
+        self.playing = False
+
+        # 読み込んだフレームデータと描画した画像のキャッシュ (キーは (世代, フレームの位置))
+        # 世代は「更新」のたびに変わり、古い描画プランで描画した画像は使われない
+        self.generation = 0
+        self.data_cache = FrameCache(128)
+        self.image_cache = FrameCache(64)
+
+        # 次のフレームを先読みするスレッド
+        self.prefetch_queue = queue.Queue()
+        threading.Thread(target=self._prefetch_loop, daemon=True).start()
+
     def browse_json(self):
-        filepath = filedialog.askopenfilename(filetypes=[("JSONファイル", "*.json")])
+        filepath = filedialog.askopenfilename(
+            filetypes=[("JSONファイル", "*.json"), ("アニメーションファイル", "*.npz *.jsonl")])
         if filepath:
             self.json_path.set(filepath)
 
+    def browse_json_folder(self):
+        folder = filedialog.askdirectory()
+        if folder:
+            self.json_path.set(folder)
+
     def browse_drawing_instructions(self):
         filepath = filedialog.askopenfilename(filetypes=[("JSONファイル", "*.json")])
         if filepath:
@@ -54,49 +139,23 @@ class BoneViewer:
 
     def update_canvas(self):
         try:
-            # JSONファイルを読み込み、定数を設定
-            data = load_data_and_set_constants(self.json_path.get())
-
-            # 定数をコンソールに表示
-            # for key, value in globals().items():
-            #     if key.isupper() and not key.startswith("__"):
-            #         print(f"{key}: {value}")
-
-            # カメラ情報からキャンバスサイズを取得
-            width = int(CAMERA_RESOLUTION_X)
-            height = int(CAMERA_RESOLUTION_Y)
-
-            # キャンバスサイズを計算 (最大サイズを超えないように)
-            canvas_width = width
-            canvas_height = height
-            if canvas_width > self.max_canvas_width:
-                ratio = self.max_canvas_width / canvas_width
-                canvas_width = self.max_canvas_width
-                canvas_height = int(canvas_height * ratio)
-            if canvas_height > self.max_canvas_height:
-                ratio = self.max_canvas_height / canvas_height
-                canvas_height = self.max_canvas_height
-                canvas_width = int(canvas_width * ratio)
-
-            # キャンバスサイズを更新
-            self.canvas.config(width=canvas_width, height=canvas_height)
-
-            # キャンバスをクリア
-            self.canvas.delete("all")
-
-            # 画像を作成 (元のサイズで作成)
-            self.image = Image.new("RGB", (width, height), "white")
-            draw = ImageDraw.Draw(self.image)
-
-            # JSONからボーン情報と描画方法を読み込み、描画
-            draw_bones(draw, data, width, height, self.drawing_instructions_path.get())
-
-            # 画像をキャンバスサイズにリサイズ
-            resized_image = self.image.resize((canvas_width, canvas_height))
-
-            # 画像をキャンバスに表示
-            self.photo_image = ImageTk.PhotoImage(resized_image)
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_image)
+            # フレームの一覧と描画方法JSONを読み込む
+            json_path = self.json_path.get()
+            self.frames = frame_store.list_frames(json_path)
+            self.source_path = json_path
+            self.render_plan = load_render_plan(self.drawing_instructions_path.get())
+            self.fps = frame_store.read_fps(json_path) or 30
+
+            # キャッシュを無効にする
+            self.generation += 1
+            self.data_cache.clear()
+            self.image_cache.clear()
+
+            # フォルダの場合は、選択中のフレームの位置を保ったままスライダーを更新する
+            self.frame_index = min(self.frame_index, max(len(self.frames) - 1, 0))
+            self.frame_slider.config(to=max(len(self.frames) - 1, 0))
+            self.frame_slider.set(self.frame_index)
+            self.show_frame(self.frame_index)
 
         except FileNotFoundError:
             print("ファイルが見つかりません。")
@@ -105,21 +164,302 @@ class BoneViewer:
         except Exception as e:
             print(f"エラーが発生しました: {e}")
 
+    def show_frame(self, index):
+        """指定した位置のフレームをキャンバスに表示し、続くフレームを先読みする"""
+        if not self.frames or self.render_plan is None or (self.generation, index) == self.displayed:
+            return
+        self.frame_index = index
+        try:
+            image = self._get_frame_image(self.generation, index)
+        except FileNotFoundError:
+            print("ファイルが見つかりません。")
+            return
+        except json.JSONDecodeError:
+            print("JSONファイルの形式が正しくありません。")
+            return
+        except Exception as e:
+            print(f"エラーが発生しました: {e}")
+            return
+
+        # キャンバスサイズを更新
+        self.canvas.config(width=image.width, height=image.height)
+
+        # キャンバスをクリアして画像を表示
+        self.canvas.delete("all")
+        self.image = image
+        self.photo_image = ImageTk.PhotoImage(image)
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_image)
+        self.frame_label.config(text=f"{self.frames[index][0]} ({index + 1} / {len(self.frames)})")
+        self.displayed = (self.generation, index)
+
+        self.prefetch_queue.put((self.generation, index))
+
+    def _get_frame_image(self, generation, index):
+        """
+        フレームをキャンバスに収まるサイズで描画した画像を取得する (キャッシュがある場合はキャッシュを使う)
+
+        先読みのスレッドからも呼び出される
+        """
+        image = self.image_cache.get((generation, index))
+        if image is not None:
+            return image
+
+        data = self.data_cache.get((generation, index))
+        if data is None:
+            data = frame_store.load_frame(self.source_path, self.frames[index][1])
+            self.data_cache.put((generation, index), data)
 
-def load_data_and_set_constants(json_path):
+        # キャンバスサイズ (最大サイズを超えないように) で直接描画する
+        width, height = frame_resolution(data)
+        canvas_width, canvas_height = self._canvas_size(width, height)
+        image = _render_frame(data, self.render_plan, scale=min(canvas_width / width, canvas_height / height))
+
+        if generation == self.generation:
+            self.image_cache.put((generation, index), image)
+        return image
+
+    def _canvas_size(self, width, height):
+        """画像のサイズから、最大サイズを超えないキャンバスサイズを計算する"""
+        canvas_width = width
+        canvas_height = height
+        if canvas_width > self.max_canvas_width:
+            ratio = self.max_canvas_width / canvas_width
+            canvas_width = self.max_canvas_width
+            canvas_height = int(canvas_height * ratio)
+        if canvas_height > self.max_canvas_height:
+            ratio = self.max_canvas_height / canvas_height
+            canvas_height = self.max_canvas_height
+            canvas_width = int(canvas_width * ratio)
+        return canvas_width, canvas_height
+
+    def _prefetch_loop(self):
+        """表示したフレームに続くフレームを、別スレッドで読み込んで描画しておく"""
+        while True:
+            generation, index = self.prefetch_queue.get()
+            for next_index in range(index + 1, index + 1 + self.prefetch_count):
+                # より新しい表示要求がある場合や、「更新」された場合は中断する
+                if not self.prefetch_queue.empty() or generation != self.generation:
+                    break
+                if next_index >= len(self.frames):
+                    break
+                if (generation, next_index) in self.image_cache:
+                    continue
+                try:
+                    self._get_frame_image(generation, next_index)
+                except Exception:
+                    break  # エラーは表示する時に表示する
+
+    def toggle_play(self):
+        """再生と停止を切り替える"""
+        self.playing = not self.playing and len(self.frames) > 1
+        self.play_button.config(text="停止" if self.playing else "再生")
+        if self.playing:
+            self._play_step()
+
+    def _play_step(self):
+        if not self.playing:
+            return
+        # 最後のフレームの次は最初のフレームに戻る
+        next_index = (self.frame_index + 1) % len(self.frames)
+        self.frame_slider.set(next_index)
+        self.show_frame(next_index)  # スライダーの command と重複した場合は1回だけ表示される
+        self.master.after(max(1, int(1000 / self.fps)), self._play_step)
+
+
+class RenderPlan:
     """
-    JSONファイルを読み込み、定数を設定する
+    描画方法JSONを読み込んで描画順にソートし、各描画命令の描画関数と式を事前に解決したもの
+
+    一度作成すれば、フレームごとのデータに対して繰り返し draw を実行できる。
 
     Args:
-        json_path (str): JSONファイルのパス
+        instructions (dict): 描画方法JSONのデータ
+    """
+
+    def __init__(self, instructions):
+        self.instructions = instructions["bones"]
+        # 描画命令の描画方法JSONでの位置 (プロファイルの集計に使う)
+        self.positions = {id(instruction): position for position, instruction in enumerate(self.instructions)}
+
+        # indexが文字列型で"="で始まっている場合は式として評価
+        # フレームの定数を参照する式がある場合は、フレームごとにソートする
+        self.dynamic_order = False
+        keys = []
+        for instruction in self.instructions:
+            index = instruction["index"]
+            if isinstance(index, str) and index.startswith("="):
+                code = compile_expression(index[1:])
+                if all(hasattr(builtins, name) for name in code.co_names):
+                    index = eval(code, {"__builtins__": builtins})
+                else:
+                    self.dynamic_order = True
+            keys.append(index)
+
+        if self.dynamic_order:
+            self.steps = self._resolve_steps(self.instructions)
+        else:
+            order = sorted(range(len(self.instructions)), key=lambda i: keys[i])
+            self.steps = self._resolve_steps([self.instructions[i] for i in order])
+
+        # 描画順の先頭から続く、フレームのデータを参照しない描画命令 (ロゴや枠線など) の数
+        # これらは静的なレイヤーとして一度だけ描画し、各フレームはその画像のコピーから描画を始める
+        self.static_count = 0
+        if not self.dynamic_order:
+            for instruction, function in self.steps:
+                if not self._is_static(instruction):
+                    break
+                self.static_count += 1
+        self._static_layers = {}
+        # GUIでは先読みのスレッドと同時に使われるため、静的なレイヤーの作成と破棄はロックして行う
+        self._static_layers_lock = threading.Lock()
+
+        # 座標などの式を事前にコンパイル (エラーは評価時に表示する)
+        for instruction in self.instructions:
+            for key, value in instruction.items():
+                if isinstance(value, str) and EXPRESSION_KEY_PATTERN.match(key):
+                    try:
+                        compile_expression(value)
+                    except SyntaxError:
+                        pass
+
+    @classmethod
+    def load(cls, drawing_instructions_path):
+        """
+        描画方法JSONファイルから RenderPlan を作成する
+
+        Args:
+            drawing_instructions_path (str): 描画方法JSONファイルのパス
+
+        Returns:
+            RenderPlan: 描画プラン
+        """
+        with open(drawing_instructions_path, 'r', encoding='utf-8') as f:
+            instructions = json.load(f)
+        return cls(instructions)
+
+    @staticmethod
+    def _resolve_steps(instructions):
+        """描画命令ごとに描画関数を解決する (未知の draw_type は無視する)"""
+        steps = []
+        for instruction in instructions:
+            function = DRAW_FUNCTIONS.get(instruction["draw_type"])
+            if function:
+                steps.append((instruction, function))
+        return steps
+
+    @staticmethod
+    def _is_static(instruction):
+        """描画命令がフレームのデータを参照しない (毎フレーム同じ描画結果になる) かどうか"""
+        if instruction["draw_type"] in FRAME_DATA_DRAW_TYPES:
+            return False
+        for key, value in instruction.items():
+            if isinstance(value, str) and EXPRESSION_KEY_PATTERN.match(key):
+                try:
+                    code = compile_expression(value)
+                except SyntaxError:
+                    return False
+                # 組み込み関数以外の名前 (BONES_* や CAMERA_* など) を参照する式はフレームごとに変わる
+                if not all(hasattr(builtins, name) for name in code.co_names):
+                    return False
+        return True
+
+    def new_image(self, mode, size, color, width, height, scale=1.0):
+        """
+        静的なレイヤーを描画済みの画像を作成する (静的なレイヤーは画像の設定ごとに一度だけ描画する)
+
+        Args:
+            mode (str): 画像のモード ("RGB" または "RGBA")
+            size (tuple): 画像のサイズ
+            color: 背景色
+            width (int): キャンバスの幅 (元の解像度)
+            height (int): キャンバスの高さ (元の解像度)
+            scale (float, optional): 元の解像度に対する縮小率. Defaults to 1.0.
+
+        Returns:
+            Image.Image: 新しい画像
+        """
+        if not self.static_count:
+            return Image.new(mode, size, color)
+
+        key = (mode, size, color, width, height, scale)
+        with self._static_layers_lock:
+            layer = self._static_layers.get(key)
+            if layer is None:
+                layer = Image.new(mode, size, color)
+                draw = ImageDraw.Draw(layer)
+                if scale != 1:
+                    draw = ScaledDraw(draw, scale)
+                namespace = FrameNamespace({}, globals())
+                for instruction, function in self.steps[:self.static_count]:
+                    function(draw, {}, width, height, instruction, namespace)
+                # GUIではキャンバスの大きさごとに作成されるため、増えすぎた場合は作り直す
+                if len(self._static_layers) >= 8:
+                    self._static_layers.clear()
+                self._static_layers[key] = layer
+        # 作成済みのレイヤーは変更しないため、コピーはロックの外で行う
+        return layer.copy()
+
+    def draw(self, draw, data, width, height, namespace=None, include_static=True, profile=None):
+        """
+        フレームのデータに対して描画命令を実行する
+
+        Args:
+            draw (ImageDraw.Draw): 描画オブジェクト
+            data (dict): JSONファイルから読み込んだデータ
+            width (int): キャンバスの幅
+            height (int): キャンバスの高さ
+            namespace (FrameNamespace, optional): フレームの定数を参照する名前空間. Defaults to None.
+            include_static (bool, optional): 静的なレイヤーの描画命令も実行するかどうか
+                                             (new_image で作成した画像に描画する場合は False). Defaults to True.
+            profile (FrameProfile, optional): 描画命令ごとの時間を記録する場合の記録先. Defaults to None.
+        """
+        # フレームの定数を参照する名前空間 (全ての描画命令で共有する)
+        if namespace is None:
+            namespace = FrameNamespace(data, globals())
+
+        steps = self.steps if include_static else self.steps[self.static_count:]
+        if self.dynamic_order:
+            steps = sorted(steps, key=lambda step: self._evaluate_index(step[0]["index"], namespace))
+
+        # ここで呼び出される関数に名前空間を渡す
+        for instruction, function in steps:
+            if profile is None:
+                function(draw, data, width, height, instruction, namespace)
+            else:
+                profile.run_instruction(self.positions[id(instruction)], function,
+                                        draw, data, width, height, instruction, namespace,
+                                        custom=instruction.get("draw_type") == "custom")
+
+    @staticmethod
+    def _evaluate_index(index, namespace):
+        """フレームの定数を使ってindexを評価する"""
+        if isinstance(index, str) and index.startswith("="):
+            return eval(compile_expression(index[1:]), namespace.global_vars, namespace)
+        return index
+
+
+# 読み込み済みの描画プラン (パスと更新日時ごと)
+_render_plan_cache = {}
+
+
+def load_render_plan(drawing_instructions_path):
+    """
+    描画方法JSONファイルから RenderPlan を取得する (ファイルが更新されていなければ再利用する)
+
+    Args:
+        drawing_instructions_path (str): 描画方法JSONファイルのパス
 
     Returns:
-        dict: JSONファイルから読み込んだデータ
+        RenderPlan: 描画プラン
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    set_constants_from_json(json_path)
-    return data
+    cache_key = (os.path.abspath(drawing_instructions_path), os.stat(drawing_instructions_path).st_mtime_ns)
+    render_plan = _render_plan_cache.get(cache_key)
+    if render_plan is None:
+        render_plan = RenderPlan.load(drawing_instructions_path)
+        _render_plan_cache.clear()
+        _render_plan_cache[cache_key] = render_plan
+    return render_plan
+
 
 def draw_bones(draw, data, width, height, drawing_instructions_path):
     """
@@ -130,70 +470,47 @@ def draw_bones(draw, data, width, height, drawing_instructions_path):
         data (dict): JSONファイルから読み込んだデータ
         width (int): キャンバスの幅
         height (int): キャンバスの高さ
-        drawing_instructions_path (str): 描画方法JSONファイルのパス
+        drawing_instructions_path (str or RenderPlan): 描画方法JSONファイルのパス、または作成済みの描画プラン
     """
-    with open(drawing_instructions_path, 'r', encoding='utf-8') as f:
-        instructions = json.load(f)
-
-    # indexでソート、indexが文字列型で"="で始まっている場合は式として評価
-    sorted_instructions = sorted(instructions["bones"], key=lambda x: eval(x["index"][1:]) if isinstance(x["index"], str) and x["index"].startswith("=") else x["index"])
-
-    for instruction in sorted_instructions:
-        draw_type = instruction["draw_type"]
-
-        # ここで呼び出される関数にグローバル変数を渡す
-        if draw_type == "circle":
-            draw_circle(draw, data, width, height, instruction, globals())
-        elif draw_type == "ellipse":
-            draw_ellipse(draw, data, width, height, instruction, globals())
-        elif draw_type == "line":
-            draw_line(draw, data, width, height, instruction, globals())
-        elif draw_type == "polyline":
-            draw_polyline(draw, data, width, height, instruction, globals())
-        elif draw_type == "rectangle":
-            draw_rectangle(draw, data, width, height, instruction, globals())
-        elif draw_type == "arc":
-            draw_arc(draw, data, width, height, instruction, globals())
-        elif draw_type == "point":
-            draw_point(draw, data, width, height, instruction, globals())
-        elif draw_type == "polygon":
-            draw_polygon(draw, data, width, height, instruction, globals())
-        elif draw_type == "pieslice":
-            draw_pieslice(draw, data, width, height, instruction, globals())
-        elif draw_type == "chord":
-            draw_chord(draw, data, width, height, instruction, globals())
-        elif draw_type == "bitmap":
-            draw_bitmap(draw, data, width, height, instruction, globals())
-        elif draw_type == "text":
-            draw_text(draw, data, width, height, instruction, globals())
-        elif draw_type == "custom":
-            custom_image = custom(data, width, height, instruction, globals())
-            if custom_image:
-                draw.bitmap((0, 0), custom_image) 
-
-
-def draw_bones_on_canvas(json_path, drawing_instructions_path, output_path=None, output_suffix="_draw", background_color="white"):
+    if isinstance(drawing_instructions_path, RenderPlan):
+        render_plan = drawing_instructions_path
+    else:
+        render_plan = load_render_plan(drawing_instructions_path)
+
+    render_plan.draw(draw, data, width, height)
+
+
+def draw_bones_on_canvas(json_path, drawing_instructions_path, output_path=None, output_suffix="_draw", background_color="white", jobs=1,
+                         profile=False, profile_output_path=None):
     """
     JSONファイルと描画方法JSONファイルからボーンを描画する
 
     Args:
-        json_path (str): 入力JSONファイルのパスまたはフォルダパス
+        json_path (str): 入力JSONファイルのパス、フォルダパス、または bone_info_save.py が出力した .npz / .jsonl ファイルのパス
         drawing_instructions_path (str): ボーン描画手順を記述したJSONファイルのパス
         output_path (str, optional): 出力画像ファイルのパスまたはフォルダパス. Defaults to None.
         output_suffix (str, optional): 出力ファイル名のサフィックス. Defaults to "_draw". 
                                       空文字列("")を指定するとサフィックスは付加されません.
         background_color (str, optional): 背景色 ("white" または "transparent"). Defaults to "white".
+        jobs (int, optional): フォルダを処理する際の並列プロセス数 (0 の場合はCPUコア数). Defaults to 1.
+        profile (bool, optional): 描画命令ごと・フレームごとの処理時間を記録し、時間のかかったものを表示する. Defaults to False.
+        profile_output_path (str, optional): 処理時間の集計結果を保存するJSONファイルのパス (指定すると profile も有効になる). Defaults to None.
     """
     try:
-        if os.path.isdir(json_path):
-            # json_path がフォルダの場合、フォルダ内の全てのJSONファイルを処理
-            for filename in os.listdir(json_path):
-                if filename.endswith(".json"):
-                    json_file_path = os.path.join(json_path, filename)
-                    output_filename = filename.replace(".json", f"{output_suffix}.png")
-                    output_file_path = os.path.join(output_path, output_filename)
-                    _draw_bones_from_files(
-                        json_file_path, drawing_instructions_path, output_file_path, background_color)
+        # 描画方法JSONは最初に一度だけ読み込む
+        render_plan = load_render_plan(drawing_instructions_path)
+        profiler = RenderProfiler(render_plan) if profile or profile_output_path else None
+
+        if os.path.isdir(json_path) or json_path.endswith(frame_store.CONTAINER_EXTENSIONS):
+            # json_path がフォルダの場合はフォルダ内の全てのJSONファイル (ファイル名順)、
+            # .npz / .jsonl ファイルの場合は含まれる全てのフレームを処理
+            tasks = []
+            for name, key in frame_store.list_frames(json_path):
+                output_file_path = os.path.join(output_path, f"{name}{output_suffix}.png")
+                tasks.append((json_path, key, output_file_path))
+
+            failures = _render_batch(tasks, drawing_instructions_path, background_color, jobs, profiler)
+            _print_batch_summary(len(tasks), failures)
         else:
             # json_path がファイルの場合、単一のJSONファイルを処理
             if output_path and os.path.isdir(output_path):
@@ -201,8 +518,19 @@ def draw_bones_on_canvas(json_path, drawing_instructions_path, output_path=None,
                 output_file_path = os.path.join(output_path, output_filename)
             else:
                 output_file_path = output_path
-            _draw_bones_from_files(
-                json_path, drawing_instructions_path, output_file_path, background_color)
+            if profiler is not None and output_file_path:
+                failures = _render_batch([(json_path, json_path, output_file_path)], drawing_instructions_path,
+                                         background_color, 1, profiler)
+                _print_batch_summary(1, failures)
+            else:
+                _draw_bones_from_files(
+                    json_path, render_plan, output_file_path, background_color)
+
+        if profiler is not None:
+            profiler.print_report()
+            if profile_output_path:
+                profiler.write_report(profile_output_path)
+                print(f"処理時間の集計結果を '{profile_output_path}' に保存しました。")
 
     except FileNotFoundError:
         print("ファイルが見つかりません。")
@@ -212,40 +540,565 @@ def draw_bones_on_canvas(json_path, drawing_instructions_path, output_path=None,
         print(f"エラーが発生しました: {e}")
 
 
+def _render_batch(tasks, drawing_instructions_path, background_color="white", jobs=1, profiler=None):
+    """
+    複数のJSONファイルを描画して画像を保存する
+
+    Args:
+        tasks (list): (入力のパス, フレームのキー, 出力画像ファイルのパス) のリスト (frame_store.list_frames を参照)
+        drawing_instructions_path (str): ボーン描画手順を記述したJSONファイルのパス
+        background_color (str, optional): 背景色 ("white" または "transparent"). Defaults to "white".
+        jobs (int, optional): 並列プロセス数 (0 の場合はCPUコア数). Defaults to 1.
+        profiler (RenderProfiler, optional): 各フレームの処理時間を集計する場合の集計先. Defaults to None.
+
+    Returns:
+        list: 描画に失敗したフレームの (入力ファイル名, エラーメッセージ) のリスト
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    profile = profiler is not None
+
+    # 他のフレームへの参照を描画する場合に備えて、このプロセスでも描画プランを読み込んでおく
+    _init_batch_worker(drawing_instructions_path, background_color, profile)
+
+    if jobs <= 1 or len(tasks) <= 1:
+        results = [_render_batch_task(task) for task in tasks]
+    else:
+        # 各プロセスが描画プランを持ち、フレームを分担して描画する
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(drawing_instructions_path, background_color, profile)) as executor:
+            results = list(executor.map(_render_batch_task, tasks, chunksize=chunksize))
+
+    # 他のフレームへの参照は、参照先のフレームの画像をコピーする
+    rendered = {
+        task[1]: task[2] for task, (label, message, source_key, frame_profile) in zip(tasks, results)
+        if message is None and source_key is None
+    }
+    failures = []
+    for (json_path, key, output_file_path), (label, message, source_key, frame_profile) in zip(tasks, results):
+        if frame_profile is not None:
+            profiler.add(frame_profile)
+        if message is None and source_key is not None:
+            message = _reuse_image(json_path, source_key, rendered.get(source_key), output_file_path)
+        if message is not None:
+            failures.append((label, message))
+    return failures
+
+
+# バッチ描画を行うプロセスごとの状態 (描画プラン、背景色、処理時間を記録するかどうか)
+_batch_worker_state = {}
+
+
+def _init_batch_worker(drawing_instructions_path, background_color, profile=False):
+    """バッチ描画を行うプロセスで描画プランを読み込む"""
+    _batch_worker_state["render_plan"] = load_render_plan(drawing_instructions_path)
+    _batch_worker_state["background_color"] = background_color
+    _batch_worker_state["profile"] = profile
+
+
+def _render_batch_task(task):
+    """
+    1フレーム分のデータを描画して画像を保存する
+
+    Args:
+        task (tuple): (入力のパス, フレームのキー, 出力画像ファイルのパス)
+
+    Returns:
+        tuple: (入力ファイル名, エラーメッセージ (成功した場合は None),
+                他のフレームへの参照の場合は参照先のフレームのキー (描画は行わない),
+                処理時間を記録する場合は FrameProfile.to_dict の結果 (記録しない場合は None))
+    """
+    json_path, key, output_file_path = task
+    label = frame_store.frame_label(json_path, key)
+    background_color = _batch_worker_state["background_color"]
+    profile = FrameProfile(label) if _batch_worker_state.get("profile") else None
+    try:
+        with _profile_stage(profile, "load"):
+            data = frame_store.load_frame(json_path, key, resolve_references=False)
+        reference = frame_store.frame_reference(data)
+        if reference is not None:
+            return label, None, frame_store.reference_key(json_path, key, reference), None
+
+        with _profile_stage(profile, "render"):
+            image = _render_frame(data, _batch_worker_state["render_plan"], background_color, profile=profile)
+        with _profile_stage(profile, "encode"):
+            _save_image(image, output_file_path, background_color)
+        print(f"画像を '{output_file_path}' に保存しました。")
+        return label, None, None, profile.to_dict() if profile is not None else None
+    except FileNotFoundError:
+        return label, "ファイルが見つかりません。", None, None
+    except json.JSONDecodeError:
+        return label, "JSONファイルの形式が正しくありません。", None, None
+    except Exception as e:
+        return label, f"エラーが発生しました: {e}", None, None
+
+
+def _reuse_image(json_path, source_key, source_output_path, output_file_path):
+    """
+    参照先のフレームの画像をコピーして保存する (参照先の画像が無い場合は参照先のデータを描画する)
+
+    Returns:
+        str or None: エラーメッセージ (成功した場合は None)
+    """
+    background_color = _batch_worker_state["background_color"]
+    try:
+        if source_output_path is None:
+            data = frame_store.load_frame(json_path, source_key)
+            image = _render_frame(data, _batch_worker_state["render_plan"], background_color)
+            _save_image(image, output_file_path, background_color)
+            print(f"画像を '{output_file_path}' に保存しました。")
+        else:
+            shutil.copyfile(source_output_path, output_file_path)
+            print(f"画像を '{output_file_path}' に保存しました ('{source_output_path}' と同じ)。")
+        return None
+    except FileNotFoundError:
+        return "ファイルが見つかりません。"
+    except json.JSONDecodeError:
+        return "JSONファイルの形式が正しくありません。"
+    except Exception as e:
+        return f"エラーが発生しました: {e}"
+
+
+class TimedDraw:
+    """
+    描画オブジェクトの代わりに描画関数に渡し、描画オブジェクトのメソッドの実行時間 (ラスタライズの時間) を計測する
+
+    Args:
+        draw (ImageDraw.Draw or ScaledDraw): 元の描画オブジェクト
+    """
+
+    def __init__(self, draw):
+        self.draw = draw
+        self.elapsed = 0.0
+
+    def __getattr__(self, name):
+        attribute = getattr(self.draw, name)
+        if not callable(attribute):
+            return attribute
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                self.elapsed += time.perf_counter() - start
+
+        return timed
+
+
+class FrameProfile:
+    """
+    1フレーム分の処理時間 (読み込み、描画、PNGの保存) と、描画命令ごとの時間を記録する
+
+    描画命令の時間は、描画オブジェクトのメソッドの時間 (rasterize) とそれ以外 (式の評価など、evaluate) に分ける
+    (custom の描画命令は、呼び出した関数の時間を含む全体を custom として記録する)
+
+    Args:
+        label (str): フレームの名前
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.stages = {}
+        self.instructions = {}
+
+    def run_instruction(self, position, function, draw, *args, custom=False):
+        """描画命令を実行し、時間を (evaluate, rasterize, custom) に分けて記録する"""
+        timed_draw = TimedDraw(draw)
+        start = time.perf_counter()
+        try:
+            function(timed_draw, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            times = self.instructions.setdefault(position, [0.0, 0.0, 0.0])
+            if custom:
+                times[2] += elapsed
+            else:
+                times[0] += elapsed - timed_draw.elapsed
+                times[1] += timed_draw.elapsed
+
+    def to_dict(self):
+        """他のプロセスに渡すための辞書に変換する"""
+        return {"label": self.label, "stages": self.stages, "instructions": self.instructions}
+
+
+@contextlib.contextmanager
+def _profile_stage(profile, stage):
+    """profile がある場合は with 文の中の処理時間を stage に記録する"""
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages[stage] = profile.stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+class RenderProfiler:
+    """
+    各フレームの FrameProfile を集計し、時間のかかった描画命令とフレームを表示する
+
+    Args:
+        render_plan (RenderPlan): 描画プラン (描画命令の index と draw_type の表示に使う)
+    """
+
+    def __init__(self, render_plan):
+        self.render_plan = render_plan
+        self.frames = []
+        self.instructions = {}
+
+    def add(self, frame_profile):
+        """1フレーム分の記録 (FrameProfile.to_dict の結果) を追加する"""
+        stages = frame_profile["stages"]
+        self.frames.append({"label": frame_profile["label"], "stages": stages, "total": sum(stages.values())})
+        for position, (evaluate, rasterize, custom) in frame_profile["instructions"].items():
+            totals = self.instructions.setdefault(position, {"count": 0, "evaluate": 0.0, "rasterize": 0.0, "custom": 0.0})
+            totals["count"] += 1
+            totals["evaluate"] += evaluate
+            totals["rasterize"] += rasterize
+            totals["custom"] += custom
+
+    def summary(self):
+        """
+        記録を集計する
+
+        Returns:
+            dict: 処理の種類ごとの合計時間、描画命令ごとの時間 (合計の多い順)、フレームごとの時間 (遅い順)
+        """
+        render_total = sum(frame["stages"].get("render", 0.0) for frame in self.frames)
+        evaluate_total = sum(totals["evaluate"] for totals in self.instructions.values())
+        rasterize_total = sum(totals["rasterize"] for totals in self.instructions.values())
+        custom_total = sum(totals["custom"] for totals in self.instructions.values())
+        stages = {
+            "load": sum(frame["stages"].get("load", 0.0) for frame in self.frames),
+            "evaluate": evaluate_total,
+            "rasterize": rasterize_total,
+            # custom の描画命令で呼び出した関数 (と結果の貼り付け) の時間
+            "custom": custom_total,
+            # 画像の作成 (静的なレイヤーのコピー) など、描画命令以外の描画の時間
+            "render_other": max(0.0, render_total - evaluate_total - rasterize_total - custom_total),
+            "encode": sum(frame["stages"].get("encode", 0.0) for frame in self.frames),
+        }
+        total = sum(stages.values())
+
+        instructions = []
+        for position, totals in self.instructions.items():
+            instruction = self.render_plan.instructions[position]
+            instruction_total = totals["evaluate"] + totals["rasterize"] + totals["custom"]
+            instructions.append({
+                "position": position,
+                "index": instruction.get("index"),
+                "draw_type": instruction.get("draw_type"),
+                # custom の場合は呼び出した関数 (ライブラリ名.関数名)
+                "function": (f"{instruction.get('library')}.{instruction.get('function')}"
+                             if instruction.get("draw_type") == "custom" else None),
+                "count": totals["count"],
+                "evaluate_s": totals["evaluate"],
+                "rasterize_s": totals["rasterize"],
+                "custom_s": totals["custom"],
+                "total_s": instruction_total,
+                "mean_ms": instruction_total / totals["count"] * 1000,
+                "share": instruction_total / total if total else 0.0,
+            })
+        instructions.sort(key=lambda item: item["total_s"], reverse=True)
+
+        return {
+            "frame_count": len(self.frames),
+            "static_instructions": self.render_plan.static_count,
+            "stages_s": stages,
+            "instructions": instructions,
+            "frames": sorted(self.frames, key=lambda frame: frame["total"], reverse=True),
+        }
+
+    def print_report(self, limit=15):
+        """
+        集計結果を表示する
+
+        Args:
+            limit (int, optional): 表示する描画命令とフレームの数. Defaults to 15.
+        """
+        if not self.frames:
+            print("処理時間を記録したフレームがありません。")
+            return
+        summary = self.summary()
+        total = sum(summary["stages_s"].values())
+        print(f"処理時間 ({summary['frame_count']} フレーム、合計 {total:.2f} 秒):")
+        for stage, value in summary["stages_s"].items():
+            print(f"  {stage:<14}{value:>10.3f} 秒{value / total if total else 0.0:>8.1%}")
+        if summary["static_instructions"]:
+            print(f"  (静的なレイヤーの {summary['static_instructions']} 個の描画命令は最初に一度だけ描画し、ここには含みません)")
+
+        # 描画命令は描画方法JSONでの位置 (bones[位置])、draw_type、index (式の場合は文字列のまま) で表示する
+        print("時間のかかった描画命令:")
+        for item in summary["instructions"][:limit]:
+            label = f"bones[{item['position']}] {item['draw_type']} (index: {json.dumps(item['index'], ensure_ascii=False)})"
+            print(f"  {label}: 合計 {item['total_s']:.3f} 秒 (1フレーム {item['mean_ms']:.2f} ms、{item['share']:.1%})")
+            if item["function"] is not None:
+                print(f"      custom 関数 {item['function']}: {item['custom_s']:.3f} 秒")
+            else:
+                print(f"      式の評価など {item['evaluate_s']:.3f} 秒、描画 {item['rasterize_s']:.3f} 秒")
+
+        print("時間のかかったフレーム:")
+        for frame in summary["frames"][:min(limit, 5)]:
+            stages = "、".join(f"{stage} {value * 1000:.1f} ms" for stage, value in frame["stages"].items())
+            print(f"  {frame['label']}: {frame['total'] * 1000:.1f} ms ({stages})")
+
+    def write_report(self, report_path):
+        """集計結果をJSONに保存する"""
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=4, ensure_ascii=False)
+
+
+def _print_batch_summary(total, failures):
+    """バッチ描画の結果 (失敗したフレームの一覧) を表示する"""
+    if failures:
+        print(f"{total} フレーム中 {len(failures)} フレームの描画に失敗しました。")
+        for label, message in failures:
+            print(f"  {label}: {message}")
+    else:
+        print(f"{total} フレームの描画が完了しました。")
+
+
+# アニメーションとして保存できる拡張子と Pillow の保存形式
+ANIMATION_FORMATS = {".webp": "WEBP", ".png": "PNG", ".apng": "PNG", ".gif": "GIF"}
+
+
+def render_animation(json_path, drawing_instructions_path, output_path, background_color="white", fps=None, jobs=1):
+    """
+    全てのフレームを描画し、フレームごとの画像ファイルを作らずに1つのアニメーションとして保存する
+
+    Args:
+        json_path (str): 入力のフォルダパス、または bone_info_save.py が出力した .npz / .jsonl ファイルのパス
+        drawing_instructions_path (str): ボーン描画手順を記述したJSONファイルのパス
+        output_path (str): 出力ファイルのパス (.webp / .png / .apng / .gif)。
+                           "-" を指定すると、無圧縮のフレーム (RGB または RGBA) を標準出力に順に書き出す
+        background_color (str, optional): 背景色 ("white" または "transparent"). Defaults to "white".
+        fps (float, optional): フレームレート (指定しない場合はマニフェストなどのfps、無い場合は30). Defaults to None.
+        jobs (int, optional): 並列プロセス数 (0 の場合はCPUコア数). Defaults to 1.
+    """
+    to_pipe = output_path == "-"
+    # 標準出力に書き出す場合は、メッセージを標準エラー出力に表示する
+    stream = sys.stdout.buffer if to_pipe else None
+    with contextlib.redirect_stdout(sys.stderr if to_pipe else sys.stdout):
+        try:
+            format_name = None
+            if not to_pipe:
+                format_name = ANIMATION_FORMATS.get(os.path.splitext(output_path)[1].lower())
+                if format_name is None:
+                    print(f"アニメーションの形式が対応していません: {output_path} ({' / '.join(ANIMATION_FORMATS)})")
+                    return
+            if fps is None:
+                fps = frame_store.read_fps(json_path) or 30
+
+            tasks = [(json_path, key) for name, key in frame_store.list_frames(json_path)]
+            failures = []
+            images = _iter_animation_frames(tasks, drawing_instructions_path, background_color, jobs, failures, to_pipe)
+
+            if to_pipe:
+                count = 0
+                for image in images:
+                    if count == 0:
+                        pixel_format = "rgba" if image.mode == "RGBA" else "rgb24"
+                        print(f"フレームを標準出力に書き出します (ffmpeg の場合: -f rawvideo -pix_fmt {pixel_format} "
+                              f"-s {image.width}x{image.height} -r {fps} -i -)")
+                    stream.write(image.tobytes())
+                    count += 1
+                stream.flush()
+            else:
+                first = next(images, None)
+                if first is None:
+                    print("描画できるフレームがありません。")
+                else:
+                    # Pillow は保存時に全てのフレームを参照するため、一度全てのフレームを描画する
+                    # (フレーム数が多い場合は標準出力に書き出して ffmpeg などで変換する)
+                    first.save(output_path, format=format_name, save_all=True, append_images=list(images),
+                               duration=1000 / fps, loop=0)
+                    print(f"アニメーションを '{output_path}' に保存しました ({fps} fps)。")
+            _print_batch_summary(len(tasks), failures)
+
+        except FileNotFoundError:
+            print("ファイルが見つかりません。")
+        except json.JSONDecodeError:
+            print("JSONファイルの形式が正しくありません。")
+        except Exception as e:
+            print(f"エラーが発生しました: {e}")
+
+
+def _iter_animation_frames(tasks, drawing_instructions_path, background_color, jobs, failures, quiet_stdout=False):
+    """
+    フレームを順に描画した画像を返すジェネレータ
+
+    他のフレームへの参照や描画に失敗したフレームは、直前のフレームの画像を繰り返す
+
+    Args:
+        tasks (list): (入力のパス, フレームのキー) のリスト
+        drawing_instructions_path (str): ボーン描画手順を記述したJSONファイルのパス
+        background_color (str): 背景色 ("white" または "transparent")
+        jobs (int): 並列プロセス数 (0 の場合はCPUコア数)
+        failures (list): 描画に失敗したフレームの (入力ファイル名, エラーメッセージ) を追加するリスト
+        quiet_stdout (bool, optional): 各プロセスのメッセージを標準エラー出力に表示する. Defaults to False.
+
+    Yields:
+        Image.Image: フレームの画像
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    _init_batch_worker(drawing_instructions_path, background_color)
+    executor = None
+    if jobs <= 1 or len(tasks) <= 1:
+        results = map(_render_animation_task, tasks)
+    else:
+        # 各プロセスが描画したフレームを、フレーム順に受け取る
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_animation_worker,
+                                       initargs=(drawing_instructions_path, background_color, quiet_stdout))
+        results = executor.map(_render_animation_task, tasks, chunksize=max(1, len(tasks) // (jobs * 16)))
+
+    try:
+        previous_key = None
+        previous_image = None
+        for (json_path, key), (label, message, source_key, pixels) in zip(tasks, results):
+            image = None
+            if message is None and source_key is not None:
+                if source_key == previous_key:
+                    image = previous_image
+                else:
+                    # 参照先が直前のフレームでない場合は参照先のデータを描画する
+                    try:
+                        data = frame_store.load_frame(json_path, source_key)
+                        image = _render_frame(data, _batch_worker_state["render_plan"], background_color)
+                    except Exception as e:
+                        message = f"エラーが発生しました: {e}"
+            elif message is None:
+                image = Image.frombytes(*pixels)
+
+            if image is None:
+                failures.append((label, message))
+                if previous_image is None:
+                    continue
+                image = previous_image
+            else:
+                previous_key = key if source_key is None else source_key
+            previous_image = image
+            yield image
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _init_animation_worker(drawing_instructions_path, background_color, quiet_stdout):
+    """アニメーションを描画するプロセスで描画プランを読み込む"""
+    _init_batch_worker(drawing_instructions_path, background_color)
+    if quiet_stdout:
+        # 標準出力はフレームの書き出しに使うため、メッセージは標準エラー出力に表示する
+        sys.stdout = sys.stderr
+
+
+def _render_animation_task(task):
+    """
+    1フレーム分のデータを描画する
+
+    Args:
+        task (tuple): (入力のパス, フレームのキー)
+
+    Returns:
+        tuple: (入力ファイル名, エラーメッセージ (成功した場合は None),
+                他のフレームへの参照の場合は参照先のフレームのキー (描画は行わない),
+                描画結果の (モード, サイズ, 画素のバイト列))
+    """
+    json_path, key = task
+    label = frame_store.frame_label(json_path, key)
+    try:
+        data = frame_store.load_frame(json_path, key, resolve_references=False)
+        reference = frame_store.frame_reference(data)
+        if reference is not None:
+            return label, None, frame_store.reference_key(json_path, key, reference), None
+
+        image = _render_frame(data, _batch_worker_state["render_plan"], _batch_worker_state["background_color"])
+        return label, None, None, (image.mode, image.size, image.tobytes())
+    except FileNotFoundError:
+        return label, "ファイルが見つかりません。", None, None
+    except json.JSONDecodeError:
+        return label, "JSONファイルの形式が正しくありません。", None, None
+    except Exception as e:
+        return label, f"エラーが発生しました: {e}", None, None
+
+
+def _render_frame(data, render_plan, background_color="white", scale=1.0, profile=None):
+    """
+    フレームのデータを描画プランに従って描画した画像を返す
+
+    Args:
+        data (dict): JSONファイルから読み込んだデータ
+        render_plan (RenderPlan): 描画プラン
+        background_color (str, optional): 背景色 ("white" または "transparent"). Defaults to "white".
+        scale (float, optional): カメラの解像度に対する画像の縮小率 (GUIのプレビュー用、1 の場合は元の解像度). Defaults to 1.0.
+        profile (FrameProfile, optional): 描画命令ごとの時間を記録する場合の記録先. Defaults to None.
+
+    Returns:
+        Image.Image: 描画結果の画像
+    """
+    # フレームの定数を参照する名前空間
+    namespace = FrameNamespace(data, globals())
+
+    # カメラ情報からキャンバスサイズを取得
+    width = int(namespace["CAMERA_RESOLUTION_X"])
+    height = int(namespace["CAMERA_RESOLUTION_Y"])
+    image_size = (width, height) if scale == 1 else (max(1, round(width * scale)), max(1, round(height * scale)))
+
+    # 画像を作成 (フレームによって変わらない描画命令は描画済み)
+    if background_color == "transparent":
+        image = render_plan.new_image("RGBA", image_size, (0, 0, 0, 0), width, height, scale)
+    else:
+        image = render_plan.new_image("RGB", image_size, background_color, width, height, scale)
+    draw = ImageDraw.Draw(image)
+    if scale != 1:
+        # 描画命令は元の解像度の座標のまま評価し、描画時に縮小する
+        draw = ScaledDraw(draw, scale)
+
+    render_plan.draw(draw, data, width, height, namespace, include_static=False, profile=profile)
+    return image
+
+
+def frame_resolution(data):
+    """フレームのデータからカメラの解像度 (幅, 高さ) を取得する"""
+    namespace = FrameNamespace(data, globals())
+    return int(namespace["CAMERA_RESOLUTION_X"]), int(namespace["CAMERA_RESOLUTION_Y"])
+
+
+def _save_image(image, output_file_path, background_color="white"):
+    """画像を保存する (透過の場合はPNGで保存)"""
+    if background_color == "transparent":
+        image.save(output_file_path, "PNG")
+    else:
+        image.save(output_file_path)
+
+
 def _draw_bones_from_files(json_file_path, drawing_instructions_path, output_file_path, background_color="white"):
     """
     JSONファイルと描画方法JSONファイルからボーンを描画し、画像を保存または表示する
 
     Args:
         json_file_path (str): 入力JSONファイルのパス
-        drawing_instructions_path (str): ボーン描画手順を記述したJSONファイルのパス
+        drawing_instructions_path (str or RenderPlan): ボーン描画手順を記述したJSONファイルのパス、または作成済みの描画プラン
         output_file_path (str, optional): 出力画像ファイルのパス. Defaults to None.
         background_color (str, optional): 背景色 ("white" または "transparent"). Defaults to "white".
     """
     try:
-        # JSONファイルを読み込み、定数を設定
-        data = load_data_and_set_constants(json_file_path)
-
-        # カメラ情報からキャンバスサイズを取得
-        width = int(CAMERA_RESOLUTION_X)
-        height = int(CAMERA_RESOLUTION_Y)
-
-        # 画像を作成
-        if background_color == "transparent":
-            image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        if isinstance(drawing_instructions_path, RenderPlan):
+            render_plan = drawing_instructions_path
         else:
-            image = Image.new("RGB", (width, height), background_color)
-        draw = ImageDraw.Draw(image)
+            render_plan = load_render_plan(drawing_instructions_path)
 
-        # JSONからボーン情報と描画方法を読み込み、描画
-        draw_bones(draw, data, width, height, drawing_instructions_path)
+        # JSONからボーン情報を読み込み、描画
+        data = frame_store.load_frame(json_file_path, json_file_path)
+        image = _render_frame(data, render_plan, background_color)
 
         # 画像を保存または表示
         if output_file_path:
-            if background_color == "transparent":
-                image.save(output_file_path, "PNG")
-            else:
-                image.save(output_file_path)
+            _save_image(image, output_file_path, background_color)
             print(f"画像を '{output_file_path}' に保存しました。")
         else:
             # GUIで表示
@@ -253,7 +1106,7 @@ def _draw_bones_from_files(json_file_path, drawing_instructions_path, output_fil
             app = BoneViewer(root)
             app.image = image
             app.photo_image = ImageTk.PhotoImage(image)
-            app.canvas.config(width=width, height=height)
+            app.canvas.config(width=image.width, height=image.height)
             app.canvas.create_image(0, 0, anchor=tk.NW,
                                     image=app.photo_image)
             root.mainloop()
@@ -266,67 +1119,38 @@ def _draw_bones_from_files(json_file_path, drawing_instructions_path, output_fil
         print(f"エラーが発生しました: {e}")
 
 
-def set_constants_from_json(json_path):
-    """
-    JSONの全ての要素を定数にする（リストにも対応）
-
-    Args:
-        json_path (str): JSONファイルのパス
-    """
-
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    def set_constants(data, prefix=""):
-        """
-        再帰的にJSONデータを走査して定数を設定する
-
-        Args:
-            data (dict or list): JSONデータ
-            prefix (str): 定数名のプレフィックス
-        """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                new_prefix = f"{prefix}{key.upper()}_" if prefix else f"{key.upper()}_"
-                set_constants(value, new_prefix)
-        elif isinstance(data, list):
-            for i, item in enumerate(data):  # リストの要素にアクセス
-                new_prefix = f"{prefix}{i}_"
-                set_constants(item, new_prefix)
-        else:
-            # キー名を英数字とアンダースコアのみで構成されるように変換
-            constant_name = re.sub(r"[^a-zA-Z0-9_]", "_", prefix.rstrip("_"))
-            
-            # 値が文字列型で、"=" で始まっている場合は式として評価
-            if isinstance(data, str) and data.startswith("="):
-                try:
-                    globals()[constant_name] = eval(data[1:]) # "="を除去して評価
-                except Exception as e:
-                    print(f"式 '{data}' の評価中にエラーが発生しました: {e}")
-                    globals()[constant_name] = data # エラーの場合は元の文字列を代入
-            else:
-                globals()[constant_name] = data 
-
-    set_constants(data)
-
-
 if __name__ == "__main__":
     # 引数パーサーの設定
     parser = argparse.ArgumentParser(
         description="JSONファイルと描画方法JSONファイルからボーンを描画する")
-    parser.add_argument("-j", "--json", help="入力JSONファイルのパスまたはフォルダパス")
+    parser.add_argument("-j", "--json", help="入力JSONファイルのパス、フォルダパス、または .npz / .jsonl ファイルのパス")
     parser.add_argument(
         "-d", "--drawing_instructions", help="ボーン描画手順を記述したJSONファイルのパス")
     parser.add_argument("-o", "--output", help="出力画像ファイルまたはフォルダのパス")
     parser.add_argument("-s", "--suffix", help="出力ファイル名のサフィックス", default="_draw")
     parser.add_argument("-b", "--background", help="背景色 (色 または transparent)", default="white")
+    parser.add_argument("--jobs", type=int, help="フォルダを処理する際の並列プロセス数 (0 の場合はCPUコア数)", default=1)
+    parser.add_argument("--animation", help="全てのフレームを1つのアニメーションとして保存するファイルのパス (.webp / .png / .apng / .gif、- の場合は標準出力)")
+    parser.add_argument("--profile", action="store_true", help="画像として保存する際に、描画命令ごと・フレームごとの処理時間を表示する")
+    parser.add_argument("--profile_output", help="--profile の集計結果を保存するJSONファイルのパス")
+    parser.add_argument("--fps", type=float, help="アニメーションのフレームレート (指定しない場合はマニフェストなどのfps、無い場合は30)")
     args = parser.parse_args()
 
-    if args.json and args.drawing_instructions and args.output:
+    if args.json and args.drawing_instructions and args.animation:
+        # アニメーションの出力先が指定されている場合は1つのファイル (または標準出力) に保存
+        render_animation(args.json, args.drawing_instructions, args.animation, args.background, args.fps, args.jobs)
+    elif args.json and args.drawing_instructions and args.output:
         # JSON, 描画方法JSON, 出力先が指定されている場合は画像として保存
-        draw_bones_on_canvas(args.json, args.drawing_instructions, args.output, args.suffix, args.background)
+        draw_bones_on_canvas(args.json, args.drawing_instructions, args.output, args.suffix, args.background, args.jobs,
+                             args.profile, args.profile_output)
     else:
-        # いずれかが指定されていない場合はGUIで表示
+        # いずれかが指定されていない場合はGUIで表示 (指定されたパスは入力欄に設定する)
         root = tk.Tk()
         app = BoneViewer(root)
+        if args.json:
+            app.json_path.set(args.json)
+        if args.drawing_instructions:
+            app.drawing_instructions_path.set(args.drawing_instructions)
+        if args.json and args.drawing_instructions:
+            app.update_canvas()
         root.mainloop()
\ No newline at end of file
@@ -0,0 +1,747 @@
+import json
+import os
+import re
+import shutil
+import zipfile
+
+import numpy as np
+
+# フレームによって変わらない情報 (rig) を分けて保存する場合のファイル名
+RIG_FILE = "rig.json"
+
+# 出力されたJSONフォルダ内の、フレームデータではないファイル
+NON_FRAME_FILES = {"manifest.json", RIG_FILE}
+
+# 複数のフレームをまとめて保存するファイルの拡張子
+CONTAINER_EXTENSIONS = (".npz", ".jsonl")
+
+# JSON Lines の各行の先頭に書き込むフレーム番号のキー (インデックスが無い場合にフレーム番号を復元するために使う)
+JSON_LINES_FRAME_KEY = "frame"
+_JSON_LINES_FRAME_PATTERN = re.compile(rb'\{"frame":(-?\d+)[,}]')
+
+
+class AnimationContainerWriter:
+    """
+    bone_info_save.py が出力するフレームデータを、列ごとの配列として1つの .npz ファイルにまとめて保存する
+
+    ボーン名やキー名、頂点番号や辺の構成など、フレームによって変わらない情報は一度だけ保存し、
+    座標やシェイプキーの値は (フレーム数, 要素数, 2|3) の配列として保存する。
+    フレームごとの配列は一時ファイルに追記していき、close で .npz にまとめる。
+
+    Args:
+        path (str): 出力する .npz ファイルのパス
+        fps (float, optional): アニメーションのフレームレート. Defaults to None.
+    """
+
+    def __init__(self, path, fps=None):
+        self.path = path
+        self.fps = fps
+        self.layout = None
+        self.frames = []
+        self._temp_dir = path + ".tmp"
+        self._columns = {}
+        self._last_frame = None
+
+    def add_frame(self, frame, data, topology=None):
+        """
+        1フレーム分のデータを追加する
+
+        Args:
+            frame (int): フレーム番号
+            data (dict): bone_info_save.py が出力するフレームデータ
+            topology (dict, optional): 頂点グループの辺の構成
+                                       ({頂点グループ名: {"edges": [[辺のインデックス, 頂点の位置1, 頂点の位置2], ...]}})
+                                       頂点グループに辺がある場合は必須. Defaults to None.
+        """
+        if self.layout is None:
+            self.layout = _create_layout(data, topology or {})
+            os.makedirs(self._temp_dir, exist_ok=True)
+
+        self._last_frame = []
+        for name, array in _split_frame(data, self.layout):
+            column = self._columns.get(name)
+            if column is None:
+                column = self._columns[name] = {
+                    "file": open(os.path.join(self._temp_dir, f"{len(self._columns)}.bin"), "wb"),
+                    "dtype": array.dtype,
+                    "shape": array.shape,
+                }
+            if array.shape != column["shape"]:
+                raise ValueError(f"フレーム {frame} の '{name}' の要素数が最初のフレームと異なります。")
+            values = np.ascontiguousarray(array, dtype=column["dtype"]).tobytes()
+            column["file"].write(values)
+            self._last_frame.append((column, values))
+
+        self.frames.append(frame)
+
+    def add_reference(self, frame, same_as):
+        """
+        直前に追加したフレームと同じ内容のフレームを追加する
+
+        .npz ファイルではフレームごとの配列の大きさが揃っている必要があるため、直前のフレームの値を再度書き込む
+
+        Args:
+            frame (int): フレーム番号
+            same_as (int): 同じ内容のフレームのフレーム番号 (直前に add_frame で追加したフレーム)
+        """
+        if self._last_frame is None:
+            raise ValueError(f"フレーム {frame} の参照先のフレーム {same_as} が追加されていません。")
+        for column, values in self._last_frame:
+            column["file"].write(values)
+        self.frames.append(frame)
+
+    def close(self):
+        """追加したフレームを .npz ファイルにまとめて保存する"""
+        if self.layout is None:
+            return
+
+        meta = dict(self.layout, fps=self.fps)
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            with zf.open("meta.npy", "w") as f:
+                np.lib.format.write_array(f, np.array(json.dumps(meta, ensure_ascii=False)))
+            with zf.open("frames.npy", "w") as f:
+                np.lib.format.write_array(f, np.array(self.frames, dtype=np.int32))
+
+            # 一時ファイルの内容を配列のヘッダーを付けてそのままコピーする
+            for name, column in self._columns.items():
+                column["file"].close()
+                header = {
+                    "descr": np.lib.format.dtype_to_descr(column["dtype"]),
+                    "fortran_order": False,
+                    "shape": (len(self.frames),) + column["shape"],
+                }
+                with zf.open(f"{name}.npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array_header_2_0(f, header)
+                    with open(column["file"].name, "rb") as raw:
+                        shutil.copyfileobj(raw, f)
+
+        shutil.rmtree(self._temp_dir, ignore_errors=True)
+        self._columns = {}
+
+
+class AnimationContainer:
+    """
+    AnimationContainerWriter で保存した .npz ファイルからフレームデータを読み込む
+
+    Args:
+        path (str): .npz ファイルのパス
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._npz = np.load(path)
+        meta = json.loads(str(self._npz["meta"]))
+        self.fps = meta.pop("fps", None)
+        self.layout = meta
+        self.frames = self._npz["frames"].tolist()
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._npz.close()
+        self._arrays = {}
+
+    def array(self, name):
+        """列の配列 (全フレーム分) を取得する"""
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = self._npz[name]
+        return array
+
+    def frame_data(self, index):
+        """
+        フレームデータを bone_info_save.py が出力するJSONと同じ形式で取得する
+
+        Args:
+            index (int): フレームの位置 (0 始まり、フレーム番号ではない)
+
+        Returns:
+            dict: フレームデータ
+        """
+        return _merge_frame(lambda name: self.array(name)[index], self.layout)
+
+
+class JsonLinesWriter:
+    """
+    フレームデータを1行1フレームの JSON Lines として1つのファイルに追記していく
+
+    インデントや余分な空白のないJSONで書き込み、各フレームの開始位置 (バイト数) を
+    「<path>.idx」に保存するため、読み込み側は先頭から読まずに任意のフレームへ移動できる。
+    各行の先頭にはフレーム番号 ({"frame": フレーム番号, ...}) を書き込み、インデックスが無い場合はそこから作り直す。
+    split_rig が True の場合は、先頭行に rig ({"rig": ...}) を書き込み、各行にはフレームレコードのみを書き込む。
+
+    Args:
+        path (str): 出力する .jsonl ファイルのパス
+        fps (float, optional): アニメーションのフレームレート. Defaults to None.
+        buffer_size (int, optional): 書き込みバッファのサイズ (バイト). Defaults to 1MB.
+        split_rig (bool, optional): フレームによって変わらない情報を先頭行に分けて保存するかどうか. Defaults to False.
+    """
+
+    def __init__(self, path, fps=None, buffer_size=1024 * 1024, split_rig=False):
+        self.path = path
+        self.fps = fps
+        self.split_rig = split_rig
+        self.rig = None
+        self.frames = []
+        self.offsets = []
+        self._file = open(path, "wb", buffering=buffer_size)
+
+    def add_frame(self, frame, data, topology=None):
+        """
+        1フレーム分のデータを追加する
+
+        Args:
+            frame (int): フレーム番号
+            data (dict): bone_info_save.py が出力するフレームデータ
+            topology (dict, optional): 頂点グループの辺の構成 (split_rig が True の場合のみ使用、
+                                       AnimationContainerWriter.add_frame を参照). Defaults to None.
+        """
+        if self.split_rig:
+            if self.rig is None:
+                self.rig = create_rig(data, topology)
+                self._write_line({"rig": self.rig})
+            data = split_frame_record(data, self.rig)
+
+        self._write_frame(frame, data)
+
+    def add_reference(self, frame, same_as):
+        """
+        他のフレームと同じ内容のフレームを、参照 ({"same_as": フレーム番号}) として追加する
+
+        Args:
+            frame (int): フレーム番号
+            same_as (int): 同じ内容のフレームのフレーム番号
+        """
+        self._write_frame(frame, {"same_as": same_as})
+
+    def _write_frame(self, frame, data):
+        self.frames.append(frame)
+        self.offsets.append(self._file.tell())
+        self._write_line({JSON_LINES_FRAME_KEY: frame, **data})
+
+    def _write_line(self, data):
+        line = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        self._file.write(line.encode("utf-8") + b"\n")
+
+    def close(self):
+        """ファイルを閉じ、フレームの位置の一覧 (インデックス) を保存する"""
+        if self._file.closed:
+            return
+        self._file.close()
+        with open(self.path + ".idx", "w", encoding="utf-8") as f:
+            json.dump({"fps": self.fps, "frames": self.frames, "offsets": self.offsets}, f)
+
+
+def read_json_lines_index(path):
+    """
+    JSON Lines ファイルのインデックスを読み込む (インデックスが無い場合はファイルを走査して作成する)
+
+    Args:
+        path (str): .jsonl ファイルのパス
+
+    Returns:
+        dict: {"fps": フレームレート, "frames": フレーム番号のリスト, "offsets": 各フレームの開始位置のリスト}
+    """
+    try:
+        with open(path + ".idx", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    # 途中で中断した場合などはインデックスが無いため、行の先頭位置と先頭に書き込んだフレーム番号を調べる
+    frames = []
+    offsets = []
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            # rig の行はフレームではない (改行で終わっていない最後の行は書き込み途中のため除く)
+            if line.strip() and line.endswith(b"\n") and not line.startswith(b'{"rig":'):
+                match = _JSON_LINES_FRAME_PATTERN.match(line)
+                frames.append(int(match.group(1)) if match else None)
+                offsets.append(offset)
+            offset += len(line)
+    if None in frames:
+        # フレーム番号を書き込んでいない古いファイルは1からの連番とする
+        frames = list(range(1, len(offsets) + 1))
+    return {"fps": None, "frames": frames, "offsets": offsets}
+
+
+def create_rig(data, topology=None):
+    """
+    最初のフレームから、フレームによって変わらない情報 (rig) を作成する
+
+    ボーンの順番と親子関係、シェイプキーの順番、頂点グループに属する頂点番号と辺の構成を保存し、
+    フレームごとのデータ (フレームレコード) はこの順番で値のみを保持する。
+
+    Args:
+        data (dict): bone_info_save.py が出力するフレームデータ
+        topology (dict, optional): 頂点グループの辺の構成 (AnimationContainerWriter.add_frame を参照). Defaults to None.
+
+    Returns:
+        dict: rig
+    """
+    return _create_layout(data, topology or {})
+
+
+def split_frame_record(data, rig):
+    """
+    フレームデータから、rig の順番で並べたフレームごとに変わる値のみを取り出す
+
+    Args:
+        data (dict): bone_info_save.py が出力するフレームデータ
+        rig (dict): create_rig で作成した rig
+
+    Returns:
+        dict: フレームレコード ({"values": {列の名前: 値のリスト}})
+    """
+    return {"values": {name: array.tolist() for name, array in _split_frame(data, rig)}}
+
+
+def merge_frame_record(record, rig):
+    """
+    フレームレコードと rig から、bone_info_save.py が出力するJSONと同じ形式のフレームデータを組み立てる
+
+    Args:
+        record (dict): split_frame_record で作成したフレームレコード
+        rig (dict): create_rig で作成した rig
+
+    Returns:
+        dict: フレームデータ
+    """
+    values = record["values"]
+    return _merge_frame(lambda name: np.asarray(values[name]), rig)
+
+
+def frame_reference(data):
+    """
+    フレームデータが他のフレームへの参照 ({"same_as": フレーム番号}) かどうかを調べる
+
+    Returns:
+        int or None: 参照先のフレーム番号 (参照ではない場合は None)
+    """
+    if isinstance(data, dict) and len(data) == 1 and isinstance(data.get("same_as"), int):
+        return data["same_as"]
+    return None
+
+
+def reference_key(path, key, frame):
+    """
+    参照先のフレームを load_frame で読み込むためのキーを取得する
+
+    Args:
+        path (str): list_frames に渡したパス
+        key: 参照元のフレームのキー
+        frame (int): 参照先のフレーム番号
+
+    Returns:
+        参照先のフレームのキー
+    """
+    if isinstance(key, tuple):
+        return key[0], reference_key(key[0], key[1], frame)
+    if path.endswith(".jsonl"):
+        index = _load_json_lines_index(path)
+        return index["offsets"][index["frames"].index(frame)]
+    # フォルダの場合は bone_info_save.py のファイル名 (フレーム番号4桁) で探す
+    return os.path.join(os.path.dirname(key), f"{frame:04d}.json")
+
+
+def is_frame_record(data):
+    """データが rig と組み合わせる必要のあるフレームレコードかどうか"""
+    return isinstance(data, dict) and len(data) == 1 and isinstance(data.get("values"), dict)
+
+
+def _value_spec(value):
+    """値の配列としての形と型を返す (小数を含む場合は JSON と同じ値に戻せるよう float64、それ以外は int32)"""
+    array = np.asarray(value)
+    dtype = "float64" if array.dtype.kind == "f" else "int32"
+    return list(array.shape), dtype
+
+
+def _flatten_shape_keys(shape_key_data, prefix=()):
+    """シェイプキーの入れ子の辞書を (キーのパス, 値) のリストにする"""
+    items = []
+    for key, value in shape_key_data.items():
+        if isinstance(value, dict):
+            items.extend(_flatten_shape_keys(value, prefix + (key,)))
+        else:
+            items.append((list(prefix + (key,)), value))
+    return items
+
+
+def _is_vertex_group(value):
+    # 出力しないキーに "vertices" / "edges" を指定した場合は、どちらか一方のみ (または空) になる
+    return isinstance(value, dict) and set(value) <= {"vertices", "edges"}
+
+
+# 辺の構成のみを保存していた頃のファイルの、辺のキー (screen_coords は頂点の座標から組み立てる)
+_DEFAULT_EDGE_FIELDS = [["edge_index", None, "static"], ["screen_coords", None, "static"]]
+
+
+def _create_layout(data, topology):
+    """最初のフレームから、フレームによって変わらない情報 (キー名や頂点の構成など) を作成する"""
+    layout = {"format": "bone_info_save", "version": 1, "key_order": list(data), "vertex_groups": {}}
+
+    for key, value in data.items():
+        if key == "bones":
+            names = list(value)
+            first_bone = value[names[0]] if names else {}
+            layout["bones"] = {
+                "names": names,
+                "fields": [
+                    [field, None, "static"] if field == "children" else [field] + list(_value_spec(field_value))
+                    for field, field_value in first_bone.items()
+                ],
+                "children": {name: info["children"] for name, info in value.items()} if "children" in first_bone else None,
+            }
+        elif key == "camera":
+            layout["camera"] = {"fields": [[field] + list(_value_spec(field_value)) for field, field_value in value.items()]}
+        elif key == "shape_keys":
+            layout["shape_keys"] = {"paths": [path for path, _ in _flatten_shape_keys(value)]}
+        elif _is_vertex_group(value):
+            vertices = value.get("vertices", [])
+            first_vertex = vertices[0] if vertices else {}
+            group = layout["vertex_groups"][key] = {
+                "keys": list(value),
+                "count": len(vertices),
+                "fields": [
+                    [field, None, "static"] if field == "vertex_index" else [field] + list(_value_spec(field_value))
+                    for field, field_value in first_vertex.items()
+                ],
+                "vertex_index": [vertex["vertex_index"] for vertex in vertices] if "vertex_index" in first_vertex else None,
+                "edges": [],
+                "edge_fields": [],
+            }
+            if "edges" in value:
+                edges = topology.get(key, {}).get("edges")
+                if edges is None and value["edges"]:
+                    raise ValueError(f"頂点グループ '{key}' の辺の構成 (topology) が指定されていません。")
+                first_edge = value["edges"][0] if value["edges"] else {}
+                group["edges"] = edges or []
+                # 辺のスクリーン座標は頂点のスクリーン座標から組み立てる (頂点を出力しない場合のみ値を保存する)
+                group["edge_fields"] = [
+                    [field, None, "static"] if field == "edge_index" or (field == "screen_coords" and "vertices" in value)
+                    else [field] + list(_value_spec(field_value))
+                    for field, field_value in first_edge.items()
+                ]
+        else:
+            raise ValueError(f"キー '{key}' は保存できません。")
+
+    return layout
+
+
+def _split_frame(data, layout):
+    """
+    フレームデータを列ごとの配列に分割する
+
+    Returns:
+        list: (列の名前, 配列) のリスト
+    """
+    columns = []
+
+    if "bones" in layout:
+        bones = data["bones"]
+        names = layout["bones"]["names"]
+        if len(bones) != len(names):
+            raise ValueError("ボーンの数が最初のフレームと異なります。")
+        for field, shape, dtype in layout["bones"]["fields"]:
+            if dtype != "static":
+                columns.append((f"bones.{field}", np.array([bones[name][field] for name in names], dtype=dtype)))
+
+    if "camera" in layout:
+        for field, shape, dtype in layout["camera"]["fields"]:
+            columns.append((f"camera.{field}", np.array(data["camera"][field], dtype=dtype)))
+
+    if "shape_keys" in layout:
+        values = [value for _, value in _flatten_shape_keys(data["shape_keys"])]
+        columns.append(("shape_keys", np.array(values, dtype="float64")))
+
+    for group_number, (key, group) in enumerate(layout["vertex_groups"].items()):
+        vertices = data[key].get("vertices", [])
+        for field, shape, dtype in group["fields"]:
+            if dtype != "static":
+                array = np.array([vertex[field] for vertex in vertices], dtype=dtype).reshape([len(vertices)] + shape)
+                columns.append((f"vertex_groups.{group_number}.{field}", array))
+        edges = data[key].get("edges", [])
+        for field, shape, dtype in group.get("edge_fields", ()):
+            if dtype != "static":
+                array = np.array([edge[field] for edge in edges], dtype=dtype).reshape([len(edges)] + shape)
+                columns.append((f"vertex_groups.{group_number}.edges.{field}", array))
+
+    return columns
+
+
+def _merge_frame(column, layout):
+    """
+    列ごとの配列からフレームデータを組み立てる
+
+    Args:
+        column (function): 列の名前からそのフレームの配列を返す関数
+        layout (dict): フレームによって変わらない情報
+
+    Returns:
+        dict: フレームデータ
+    """
+    data = {}
+    group_numbers = {key: i for i, key in enumerate(layout["vertex_groups"])}
+
+    for key in layout["key_order"]:
+        if key == "bones":
+            names = layout["bones"]["names"]
+            fields = [
+                (field, None if dtype == "static" else column(f"bones.{field}").tolist())
+                for field, shape, dtype in layout["bones"]["fields"]
+            ]
+            children = layout["bones"]["children"]
+            data["bones"] = {
+                name: {
+                    field: children[name] if values is None else values[i]
+                    for field, values in fields
+                }
+                for i, name in enumerate(names)
+            }
+        elif key == "camera":
+            data["camera"] = {
+                field: column(f"camera.{field}").tolist()
+                for field, shape, dtype in layout["camera"]["fields"]
+            }
+        elif key == "shape_keys":
+            shape_key_data = {}
+            for path, value in zip(layout["shape_keys"]["paths"], column("shape_keys").tolist()):
+                target = shape_key_data
+                for part in path[:-1]:
+                    target = target.setdefault(part, {})
+                target[path[-1]] = value
+            data["shape_keys"] = shape_key_data
+        else:
+            group = layout["vertex_groups"][key]
+            group_number = group_numbers[key]
+            fields = [
+                (field, group["vertex_index"] if dtype == "static" else column(f"vertex_groups.{group_number}.{field}").tolist())
+                for field, shape, dtype in group["fields"]
+            ]
+            vertices = [{field: values[i] for field, values in fields} for i in range(group["count"])]
+            group_data = {}
+            for group_key in group.get("keys", ["vertices", "edges"]):
+                if group_key == "vertices":
+                    group_data["vertices"] = vertices
+                else:
+                    group_data["edges"] = _merge_edges(group, vertices, group_number, column)
+            data[key] = group_data
+
+    return data
+
+
+def _merge_edges(group, vertices, group_number, column):
+    """頂点グループの辺のリストを、辺の構成と頂点のスクリーン座標 (または保存した値) から組み立てる"""
+    screen_coords = [vertex.get("screen_coords") for vertex in vertices]
+    edge_fields = [
+        (field, None if dtype == "static" else column(f"vertex_groups.{group_number}.edges.{field}").tolist())
+        for field, shape, dtype in group.get("edge_fields", _DEFAULT_EDGE_FIELDS)
+    ]
+    edges = []
+    for position, (edge_index, v1_position, v2_position) in enumerate(group["edges"]):
+        edge = {}
+        for field, values in edge_fields:
+            if values is not None:
+                edge[field] = values[position]
+            elif field == "edge_index":
+                edge[field] = edge_index
+            else:
+                edge[field] = [screen_coords[v1_position], screen_coords[v2_position]]
+        edges.append(edge)
+    return edges
+
+
+# 読み込み済みの rig (ファイルのパス → (更新日時, rig))
+_rig_cache = {}
+
+
+def load_rig(path):
+    """
+    rig を読み込む
+
+    Args:
+        path (str): rig.json のパス、または rig を先頭行に保存した .jsonl ファイルのパス
+
+    Returns:
+        dict: rig
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _rig_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    if path.endswith(".jsonl"):
+        with open(path, "rb") as f:
+            rig = json.loads(f.readline()).get("rig")
+        if rig is None:
+            raise ValueError(f"'{path}' の先頭行に rig がありません。")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rig = json.load(f)
+
+    _rig_cache[path] = (mtime, rig)
+    return rig
+
+
+# 読み込み済みの JSON Lines のインデックス (ファイルのパス → (更新日時, インデックス))
+_json_lines_index_cache = {}
+
+
+def _load_json_lines_index(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_lines_index_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _json_lines_index_cache[path] = (mtime, read_json_lines_index(path))
+    return cached[1]
+
+
+# 読み込み済みのコンテナ (load_frame で使用、プロセスごと、ファイルのパス → (更新日時, コンテナ))
+_open_containers = {}
+
+
+def _open_container(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _open_containers.get(path)
+    if cached is None or cached[0] != mtime:
+        # 書き直されたファイルは開き直す (古いコンテナは閉じる)
+        if cached is not None:
+            cached[1].close()
+        cached = _open_containers[path] = (mtime, AnimationContainer(path))
+    return cached[1]
+
+
+def list_frames(path):
+    """
+    フレームデータの一覧を取得する
+
+    フォルダの場合は、フォルダ内のJSONファイルに加えて .npz / .jsonl ファイル
+    (bone_info_save_launcher.py で区間ごとに保存されたものなど) の全てのフレームも含める
+
+    Args:
+        path (str): JSONファイルのフォルダ、JSONファイル、.npz ファイル、または .jsonl ファイルのパス
+
+    Returns:
+        list: (出力ファイル名に使う名前, load_frame に渡すキー) のリスト (フレーム順)
+    """
+    if os.path.isdir(path):
+        frames = []
+        containers = []
+        for filename in sorted(os.listdir(path)):
+            if filename.endswith(".json") and filename not in NON_FRAME_FILES:
+                frames.append((filename.replace(".json", ""), os.path.join(path, filename)))
+            elif filename.endswith(CONTAINER_EXTENSIONS):
+                containers.append(os.path.join(path, filename))
+        if not containers:
+            return frames
+        # コンテナのフレームは (コンテナのパス, コンテナ内のキー) をキーとし、全体をフレーム番号順に並べる
+        for container_path in containers:
+            frames.extend((name, (container_path, key)) for name, key in list_frames(container_path))
+        return sorted(frames, key=lambda frame: _frame_number(frame[0]))
+    if path.endswith(".npz"):
+        # 一覧の取得後に別のプロセスで読み込まれることがあるため、ファイルは開いたままにしない
+        with AnimationContainer(path) as container:
+            return [(f"{frame:04d}", index) for index, frame in enumerate(container.frames)]
+    if path.endswith(".jsonl"):
+        index = read_json_lines_index(path)
+        return [(f"{frame:04d}", offset) for frame, offset in zip(index["frames"], index["offsets"])]
+    return [(os.path.splitext(os.path.basename(path))[0], path)]
+
+
+def load_frame(path, key, resolve_references=True):
+    """
+    フレームデータを読み込む
+
+    Args:
+        path (str): list_frames に渡したパス
+        key: list_frames が返したキー
+        resolve_references (bool, optional): 他のフレームへの参照の場合に参照先のフレームを読み込むかどうか
+                                             (False の場合は {"same_as": フレーム番号} をそのまま返す). Defaults to True.
+
+    Returns:
+        dict: フレームデータ (フレームレコードの場合は rig と組み合わせたもの)
+    """
+    if isinstance(key, tuple):
+        # フォルダ内のコンテナのフレーム
+        return load_frame(*key, resolve_references)
+    if path.endswith(".npz"):
+        return _open_container(path).frame_data(key)
+    if path.endswith(".jsonl"):
+        # 開始位置から1行だけ読み込む (スレッドやプロセス間でファイル位置を共有しないよう毎回開く)
+        with open(path, "rb") as f:
+            f.seek(key)
+            data = json.loads(f.readline())
+        if isinstance(data.get(JSON_LINES_FRAME_KEY), int):
+            del data[JSON_LINES_FRAME_KEY]
+        rig_path = path
+    else:
+        with open(key, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        rig_path = os.path.join(os.path.dirname(key), RIG_FILE)
+
+    reference = frame_reference(data)
+    if reference is not None:
+        if resolve_references:
+            return load_frame(path, reference_key(path, key, reference))
+    elif is_frame_record(data):
+        data = merge_frame_record(data, load_rig(rig_path))
+    return data
+
+
+def frame_label(path, key):
+    """
+    エラーの表示などに使うフレームの名前を取得する
+
+    Args:
+        path (str): list_frames に渡したパス
+        key: list_frames が返したキー
+
+    Returns:
+        str: JSONファイルのパス、またはコンテナのパスとコンテナ内のキー
+    """
+    if isinstance(key, tuple):
+        return frame_label(*key)
+    return key if isinstance(key, str) else f"{path} [{key}]"
+
+
+def _frame_number(name):
+    """list_frames の名前からフレーム番号を取得する (数字ではない名前は先頭に並べる)"""
+    try:
+        return int(name)
+    except ValueError:
+        return float("-inf")
+
+
+def read_fps(path):
+    """
+    フレームデータのフレームレートを取得する
+
+    .npz ファイルは保存したメタデータ、.jsonl ファイルはインデックス、
+    フォルダ (またはフォルダ内のJSONファイル) は bone_info_save.py が出力したマニフェスト (manifest.json) から取得する
+
+    Args:
+        path (str): list_frames に渡すパス
+
+    Returns:
+        float or None: フレームレート (取得できない場合は None)
+    """
+    try:
+        if path.endswith(".npz"):
+            with AnimationContainer(path) as container:
+                return container.fps
+        if path.endswith(".jsonl"):
+            return _load_json_lines_index(path).get("fps")
+
+        folder = path if os.path.isdir(path) else os.path.dirname(path)
+        with open(os.path.join(folder, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("fps")
+    except (OSError, ValueError):
+        return None
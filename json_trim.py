@@ -3,6 +3,46 @@ import csv
 import os
 from collections import OrderedDict
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import frame_store
+
+def load_bone_name_mapping(csv_path):
+    """
+    CSVファイルからボーン名変換情報を取得する
+
+    Args:
+        csv_path (str): ボーン名変換情報を記述したCSVファイルのパス
+
+    Returns:
+        dict: 元のボーン名 → 新しいボーン名 の辞書
+    """
+    bone_name_mapping = {}
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)  # ヘッダー行をスキップ
+        for row in reader:
+            original_name, new_name = row
+            bone_name_mapping[original_name] = new_name
+    return bone_name_mapping
+
+def load_exclude_keys(exclude_keys_path):
+    """
+    除外するキーが記述されたテキストファイルを読み込む (空行と "#" で始まる行は無視する)
+
+    Args:
+        exclude_keys_path (str): 除外するキーが1行に1つずつ記述されたテキストファイルのパス
+
+    Returns:
+        list: 除外するキーのリスト
+    """
+    exclude_keys = []
+    with open(exclude_keys_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key = line.strip()
+            if key and not key.startswith("#"):
+                exclude_keys.append(key)
+    return exclude_keys
 
 def extract_bone_data(input_json_path, output_json_path, csv_path, exclude_keys=None):
     """
@@ -17,50 +57,182 @@ def extract_bone_data(input_json_path, output_json_path, csv_path, exclude_keys=
     """
 
     # JSONファイルを読み込み
-    with open(input_json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = frame_store.load_frame(input_json_path, input_json_path)
 
     # CSVファイルからボーン名変換情報を取得
-    bone_name_mapping = {}
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        next(reader)  # ヘッダー行をスキップ
-        for row in reader:
-            original_name, new_name = row
-            bone_name_mapping[original_name] = new_name
+    bone_name_mapping = load_bone_name_mapping(csv_path)
 
-    # 新しいJSONファイルに出力するデータ
-    output_data = {"bones": OrderedDict()}
+    output_data = trim_frame_data(data, bone_name_mapping, exclude_keys)
 
-    def remove_keys_recursive(data, exclude_keys):
-        if isinstance(data, dict):
-            for key in list(data.keys()):  # 削除中にエラーが出ないようにlist(data.keys())とします
-                if key in exclude_keys:
-                    del data[key]
-                else:
-                    remove_keys_recursive(data[key], exclude_keys)
-        elif isinstance(data, list):
-            for item in data:
-                remove_keys_recursive(item, exclude_keys)
+    # JSON ファイルに出力
+    with open(output_json_path, 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=4, ensure_ascii=False)
+
+def trim_frame_data(data, bone_name_mapping, exclude_keys=None):
+    """
+    フレームデータから指定されたボーンのデータとカメラ情報を抽出し、ボーン名を変換する
+
+    出力するデータは元のデータの値をコピーせずにそのまま使い、除外するキーは元のデータから削除するため、
+    data は変更される (読み込んだフレームごとに一度だけ呼び出すこと)
+
+    Args:
+        data (dict): bone_info_save.py が出力したフレームデータ
+        bone_name_mapping (dict): 元のボーン名 → 新しいボーン名 の辞書
+        exclude_keys (list, optional): 除外するキーのリスト。指定しない場合は何も削除しない。Defaults to None.
 
-    # ボーン情報以外のデータをコピー & 不要なキーを削除
+    Returns:
+        dict: 抽出したデータ
+    """
+
+    # 新しいJSONファイルに出力するデータ (元のデータの値をコピーせずにそのまま使う)
+    output_data = {"bones": OrderedDict()}
+    exclude_keys = frozenset(exclude_keys) if exclude_keys else frozenset()
+
+    # ボーン情報以外のデータ & 不要なキーを削除
     for key, value in data.items():
         if key != "bones":
-            output_data[key] = value.copy()
+            output_data[key] = value
             if exclude_keys:
-                remove_keys_recursive(output_data[key], exclude_keys)
+                remove_keys_recursive(value, exclude_keys)
 
-    # 元のボーン名でループ (bonesの処理)
-    for original_name in data["bones"]:
+    # 元のボーン名でループ (bonesの処理、変換情報に無いボーンは走査しない)
+    for original_name, bone_info in data["bones"].items():
         if original_name in bone_name_mapping:
-            new_bone_name = bone_name_mapping[original_name]
-            output_data["bones"][new_bone_name] = data["bones"][original_name].copy()
+            output_data["bones"][bone_name_mapping[original_name]] = bone_info
             if exclude_keys:
-                remove_keys_recursive(output_data["bones"][new_bone_name], exclude_keys)
+                remove_keys_recursive(bone_info, exclude_keys)
 
-    # JSON ファイルに出力
-    with open(output_json_path, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=4, ensure_ascii=False)
+    return output_data
+
+def remove_keys_recursive(data, exclude_keys):
+    """
+    JSONデータから除外するキーを一度の走査でその場で削除する
+
+    キーの判定は集合演算でまとめて行い、数値や文字列の値には再帰しない
+
+    Args:
+        data (dict or list): JSONデータ (変更される、dict と list 以外の値では何もしない)
+        exclude_keys (frozenset): 除外するキーの集合
+    """
+    if isinstance(data, dict):
+        if not exclude_keys.isdisjoint(data):
+            for key in data.keys() & exclude_keys:
+                del data[key]
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                remove_keys_recursive(value, exclude_keys)
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, (dict, list)):
+                remove_keys_recursive(item, exclude_keys)
+
+def list_trim_tasks(input_dir, output_dir, suffix="_trim", incremental=False, dependency_paths=()):
+    """
+    入力フォルダ内のJSONファイル (と .npz / .jsonl ファイルの全てのフレーム) について、出力ファイルの一覧を作成する
+
+    Args:
+        input_dir (str): 入力JSONファイルが格納されているフォルダ
+        output_dir (str): 出力JSONファイルを保存するフォルダ
+        suffix (str, optional): 出力ファイル名に付加するサフィックス. Defaults to "_trim".
+        incremental (bool, optional): 出力ファイルが入力ファイル (と dependency_paths) より新しいフレームを除外するかどうか. Defaults to False.
+        dependency_paths (tuple, optional): 変更された場合に全てのフレームを出力し直すファイル (CSVファイルなど) のパス. Defaults to ().
+
+    Returns:
+        tuple: ((入力のパス, フレームのキー, 出力JSONファイルのパス) のリスト, 除外したフレームの数)
+    """
+    dependency_mtime = max((os.stat(path).st_mtime_ns for path in dependency_paths if path), default=0)
+
+    def is_up_to_date(input_mtime, output_json_path):
+        try:
+            return os.stat(output_json_path).st_mtime_ns >= max(input_mtime, dependency_mtime)
+        except FileNotFoundError:
+            return False
+
+    # 入力フォルダに出力する場合は、以前の実行で出力したファイルを入力として扱わない (*_trim_trim.json を作らない)
+    output_suffix = suffix + ".json" if suffix and os.path.abspath(output_dir) == os.path.abspath(input_dir) else None
+
+    tasks = []
+    skipped = 0
+    for filename in sorted(os.listdir(input_dir)):
+        input_path = os.path.join(input_dir, filename)
+        if filename.endswith(frame_store.CONTAINER_EXTENSIONS):
+            frames = [(key, name) for name, key in frame_store.list_frames(input_path)]
+        elif (filename.endswith(".json") and filename not in frame_store.NON_FRAME_FILES
+              and not (output_suffix and filename.endswith(output_suffix))):
+            frames = [(input_path, os.path.splitext(filename)[0])]
+        else:
+            continue
+
+        input_mtime = os.stat(input_path).st_mtime_ns
+        for key, name in frames:
+            output_json_path = os.path.join(output_dir, name + suffix + ".json")
+            if incremental and is_up_to_date(input_mtime, output_json_path):
+                skipped += 1
+                continue
+            tasks.append((input_path, key, output_json_path))
+    return tasks, skipped
+
+def trim_frames(tasks, csv_path, exclude_keys=None, jobs=1):
+    """
+    複数のフレームからデータを抽出してJSONファイルに出力する
+
+    Args:
+        tasks (list): (入力のパス, フレームのキー, 出力JSONファイルのパス) のリスト (list_trim_tasks を参照)
+        csv_path (str): ボーン名変換情報を記述したCSVファイルのパス
+        exclude_keys (list, optional): 除外するキーのリスト。指定しない場合は何も削除しない。Defaults to None.
+        jobs (int, optional): 並列プロセス数 (0 の場合はCPUコア数). Defaults to 1.
+
+    Returns:
+        list: 失敗したフレームの (入力ファイル名, エラーメッセージ) のリスト
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1 or len(tasks) <= 1:
+        _init_trim_worker(csv_path, exclude_keys)
+        results = [_trim_task(task) for task in tasks]
+    else:
+        # 各プロセスがボーン名変換情報と除外するキーを一度だけ読み込み、フレームを分担して処理する
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_trim_worker,
+                                 initargs=(csv_path, exclude_keys)) as executor:
+            results = list(executor.map(_trim_task, tasks, chunksize=chunksize))
+
+    return [(label, message) for label, message in results if message is not None]
+
+# データの抽出を行うプロセスごとの状態 (ボーン名変換情報と除外するキー)
+_trim_worker_state = {}
+
+def _init_trim_worker(csv_path, exclude_keys):
+    """データの抽出を行うプロセスでボーン名変換情報を読み込む"""
+    _trim_worker_state["bone_name_mapping"] = load_bone_name_mapping(csv_path)
+    _trim_worker_state["exclude_keys"] = frozenset(exclude_keys) if exclude_keys else frozenset()
+
+def _trim_task(task):
+    """
+    1フレーム分のデータを抽出してJSONファイルに出力する
+
+    Args:
+        task (tuple): (入力のパス, フレームのキー, 出力JSONファイルのパス)
+
+    Returns:
+        tuple: (入力ファイル名, エラーメッセージ (成功した場合は None))
+    """
+    input_path, key, output_json_path = task
+    label = key if isinstance(key, str) else f"{input_path} [{key}]"
+    try:
+        data = frame_store.load_frame(input_path, key)
+        output_data = trim_frame_data(data, _trim_worker_state["bone_name_mapping"], _trim_worker_state["exclude_keys"])
+        with open(output_json_path, 'w', encoding='utf-8') as f:
+            json.dump(output_data, f, indent=4, ensure_ascii=False)
+        print(f"データを '{output_json_path}' に出力しました。")
+        return label, None
+    except FileNotFoundError:
+        return label, "ファイルが見つかりません。"
+    except json.JSONDecodeError:
+        return label, "JSONファイルの形式が正しくありません。"
+    except Exception as e:
+        return label, f"エラーが発生しました: {e}"
 
 if __name__ == "__main__":
     # 引数パーサーの設定
@@ -71,6 +243,9 @@ if __name__ == "__main__":
     parser.add_argument("-o", "--output_dir", help="出力JSONファイルを保存するフォルダ (指定しない場合は入力フォルダと同じ)", default=None)
     parser.add_argument("-s", "--suffix", help="出力ファイル名に付加するサフィックス (指定しない場合は'_trim'が付加される)", default="_trim")
     parser.add_argument("--no-suffix", help="出力ファイル名にサフィックスを付加しない", action="store_true")
+    parser.add_argument("--jobs", type=int, help="並列プロセス数 (0 の場合はCPUコア数)", default=1)
+    parser.add_argument("--incremental", action="store_true",
+                        help="出力ファイルが入力ファイル、CSVファイル、除外するキーのファイルより新しいフレームは処理しない")
     args = parser.parse_args()
 
     # 出力フォルダの設定
@@ -85,17 +260,16 @@ if __name__ == "__main__":
     # 除外するキーのリストを読み込み (指定がない場合はNone)
     exclude_keys = []
     if args.exclude_keys_file:
-        with open(args.exclude_keys_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                exclude_keys.append(line.strip())
-
-    # 入力フォルダ内のJSONファイルを処理
-    for filename in os.listdir(args.input_dir):
-        if filename.endswith(".json"):
-            input_json_path = os.path.join(args.input_dir, filename)
-            output_filename = os.path.splitext(filename)[0] + suffix + ".json"
-            output_json_path = os.path.join(output_dir, output_filename)
-
-            # JSONデータの抽出
-            extract_bone_data(input_json_path, output_json_path, args.csv_path, exclude_keys)
-            print(f"データを '{output_json_path}' に出力しました。")
\ No newline at end of file
+        exclude_keys = load_exclude_keys(args.exclude_keys_file)
+
+    # 入力フォルダ内のJSONファイル (と .npz / .jsonl ファイル) を処理
+    tasks, skipped = list_trim_tasks(args.input_dir, output_dir, suffix, args.incremental,
+                                     (args.csv_path, args.exclude_keys_file))
+    if skipped:
+        print(f"{skipped} フレームは出力ファイルが最新のため処理しません。")
+
+    failures = trim_frames(tasks, args.csv_path, exclude_keys, args.jobs)
+    if failures:
+        print(f"{len(tasks)} フレーム中 {len(failures)} フレームの処理に失敗しました。")
+        for label, message in failures:
+            print(f"  {label}: {message}")
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+テスト用の共通処理
+
+benchmarks/stub の bpy / mathutils / bpy_extras と、合成したシーン (benchmarks/synthetic_scene.py) を使えるようにする
+"""
+import contextlib
+import io
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(ROOT_DIR, "benchmarks")
+for path in (ROOT_DIR, BENCHMARK_DIR, os.path.join(BENCHMARK_DIR, "stub")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def run_exporter(output_dir, *args):
+    """
+    bone_info_save.py の main を、現在の stub のシーンに対して実行する
+
+    Args:
+        output_dir (str): JSONファイルを保存するフォルダ
+        *args: "--" 以降に指定する追加の引数 (--output_format npz など)
+
+    Returns:
+        str: 標準出力に表示された内容
+    """
+    import bone_info_save
+
+    # 前のテストで変更されたスクリプト冒頭の設定を戻す
+    bone_info_save.output_format = "json"
+    bone_info_save.split_rig = False
+    bone_info_save.dedupe_frames = False
+    bone_info_save.exclude_keys_file = ""
+    bone_info_save.bone_name_csv_path = ""
+    bone_info_save.saved_frame_files.clear()
+    bone_info_save.duplicate_frames.clear()
+    for name, value in list(vars(bone_info_save).items()):
+        if name.endswith("_cache") and isinstance(value, dict):
+            value.clear()
+
+    argv = sys.argv
+    sys.argv = ["blender", "--", "--output_dir", output_dir, *args]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            bone_info_save.main()
+    finally:
+        sys.argv = argv
+    return stdout.getvalue()
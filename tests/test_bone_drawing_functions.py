@@ -0,0 +1,98 @@
+import io
+import threading
+import unittest
+
+import support  # noqa: F401 (リポジトリのスクリプトを読み込めるようにする)
+
+from PIL import Image, ImageDraw
+
+import bone_drawing_functions
+import bone_viewer
+
+# custom から呼び出された際に受け取ったフレーム番号 (スレッドごと)
+_received = {}
+# custom から呼び出された際に受け取った global_vars
+_namespaces = []
+
+
+def record_frame(data, width, height, global_vars, label):
+    """custom から呼び出される描画関数 (受け取った data を記録して 1x1 のPNGを返す)"""
+    _received.setdefault(threading.get_ident(), []).append((label, data["frame"]))
+    buffer = io.BytesIO()
+    Image.new("RGBA", (1, 1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def record_namespace(data, width, height, global_vars):
+    """custom から呼び出される描画関数 (受け取った global_vars を記録する)"""
+    _namespaces.append(global_vars)
+    buffer = io.BytesIO()
+    Image.new("RGBA", (1, 1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class CustomTest(unittest.TestCase):
+    def test_params_are_not_shared_between_calls(self):
+        instruction = {"draw_type": "custom", "library": __name__, "function": "record_frame",
+                       "params": {"label": "a"}}
+
+        def render(frame):
+            for _ in range(200):
+                bone_drawing_functions.custom({"frame": frame}, 10, 10, instruction, {})
+
+        threads = [threading.Thread(target=render, args=(frame,)) for frame in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 描画命令の params は変更されず、各呼び出しは自分のフレームのデータを受け取る
+        self.assertEqual(instruction["params"], {"label": "a"})
+        for calls in _received.values():
+            self.assertEqual(len({frame for _, frame in calls}), 1)
+
+    def test_global_vars_is_frame_namespace(self):
+        plan = bone_viewer.RenderPlan({"bones": [
+            {"index": 0, "draw_type": "custom", "library": __name__, "function": "record_namespace"},
+        ]})
+        image = Image.new("RGB", (10, 10))
+        bone_viewer.draw_bones(ImageDraw.Draw(image), {"frame": 3, "bones": {"a": {"screen_coords": [4, 5]}}},
+                               10, 10, plan)
+
+        # フレームの定数を名前で参照でき、グローバル変数の辞書は global_vars.global_vars で参照できる
+        namespace = _namespaces.pop()
+        self.assertEqual(namespace["BONES_A_SCREEN_COORDS_1"], 5)
+        self.assertEqual(namespace.get("FRAME"), 3)
+        self.assertIs(namespace.global_vars["Image"], Image)
+        with self.assertRaises(TypeError):
+            namespace["X"] = 1
+
+
+class StaticLayerTest(unittest.TestCase):
+    def test_new_image_from_several_threads(self):
+        plan = bone_viewer.RenderPlan({"bones": [
+            {"index": 0, "draw_type": "rectangle", "x": "2", "y": "2", "width": 4, "height": 4, "color": "red"},
+            {"index": 1, "draw_type": "circle", "x": "BONES_A_SCREEN_COORDS_0", "y": "5", "radius": 1},
+        ]})
+        self.assertEqual(plan.static_count, 1)
+        errors = []
+
+        def create(offset):
+            try:
+                for i in range(100):
+                    size = 10 + (i + offset) % 12  # 8 種類より多い大きさでキャッシュの破棄も起こす
+                    image = plan.new_image("RGB", (size, size), "white", size, size)
+                    if image.size != (size, size) or image.getpixel((1, 1)) != (255, 0, 0):
+                        errors.append(size)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=create, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
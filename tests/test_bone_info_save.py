@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401 (stub の bpy を読み込めるようにする)
+
+import frame_store
+import synthetic_scene
+
+
+class NoCameraTest(unittest.TestCase):
+    """シーンにカメラが無い場合は、カメラとスクリーン座標を除いてフレームを保存する"""
+
+    def setUp(self):
+        self.scene = synthetic_scene.build_scene(bone_count=5, group_size=10, frame_count=2)
+        self.scene.camera = None
+
+    def assert_without_screen_coords(self, data):
+        self.assertNotIn("camera", data)
+        for bone in data["bones"].values():
+            self.assertIn("global_coords", bone)
+            self.assertNotIn("screen_coords", bone)
+            self.assertNotIn("tail_screen_coords", bone)
+        group = data["group1"]
+        self.assertTrue(group["vertices"])
+        self.assertNotIn("screen_coords", group["vertices"][0])
+        self.assertIn("global_coords", group["vertices"][0])
+        self.assertEqual(list(group["edges"][0]), ["edge_index"])
+
+    def test_json(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            support.run_exporter(output_dir)
+            frames = frame_store.list_frames(output_dir)
+            self.assertEqual([name for name, _ in frames], ["0001", "0002"])
+            self.assert_without_screen_coords(frame_store.load_frame(output_dir, frames[0][1]))
+
+    def test_npz(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            support.run_exporter(output_dir, "--output_format", "npz")
+            path = os.path.join(output_dir, "animation_0001-0002.npz")
+            with frame_store.AnimationContainer(path) as container:
+                self.assertEqual(container.frames, [1, 2])
+                self.assert_without_screen_coords(container.frame_data(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
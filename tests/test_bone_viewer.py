@@ -0,0 +1,59 @@
+import contextlib
+import io
+import time
+import unittest
+
+import support  # noqa: F401 (リポジトリのスクリプトを読み込めるようにする)
+
+from PIL import Image
+
+import bone_viewer
+
+
+def slow_custom(data, width, height, global_vars):
+    """custom から呼び出される描画関数 (時間がかかる関数の代わり)"""
+    time.sleep(0.02)
+    buffer = io.BytesIO()
+    Image.new("RGBA", (1, 1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class RenderProfilerTest(unittest.TestCase):
+    """custom の関数の時間を evaluate と分けて集計し、描画命令を位置と index で表示する"""
+
+    def setUp(self):
+        self.plan = bone_viewer.RenderPlan({"bones": [
+            {"index": "=5-3", "draw_type": "circle", "x": "BONES_A_SCREEN_COORDS_0", "y": "5", "radius": 1},
+            {"index": 7, "draw_type": "custom", "library": __name__, "function": "slow_custom"},
+        ]})
+        self.profiler = bone_viewer.RenderProfiler(self.plan)
+        data = {"camera": {"resolution_x": 10, "resolution_y": 10}, "bones": {"a": {"screen_coords": [4, 5]}}}
+        for frame in range(2):
+            profile = bone_viewer.FrameProfile(f"{frame:04d}")
+            with bone_viewer._profile_stage(profile, "render"):
+                bone_viewer._render_frame(data, self.plan, profile=profile)
+            self.profiler.add(profile.to_dict())
+
+    def test_summary(self):
+        summary = self.profiler.summary()
+        self.assertGreaterEqual(summary["stages_s"]["custom"], 0.04)
+        self.assertLess(summary["stages_s"]["evaluate"], summary["stages_s"]["custom"])
+
+        custom, circle = summary["instructions"]
+        self.assertEqual((custom["position"], custom["function"]), (1, f"{__name__}.slow_custom"))
+        self.assertEqual((custom["evaluate_s"], custom["rasterize_s"]), (0.0, 0.0))
+        self.assertEqual(custom["total_s"], custom["custom_s"])
+        self.assertEqual((circle["position"], circle["index"], circle["function"], circle["custom_s"]),
+                         (0, "=5-3", None, 0.0))
+
+    def test_print_report(self):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            self.profiler.print_report()
+        report = stdout.getvalue()
+        self.assertIn('bones[0] circle (index: "=5-3")', report)
+        self.assertIn("bones[1] custom (index: 7)", report)
+        self.assertIn(f"custom 関数 {__name__}.slow_custom", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401 (stub の bpy を読み込めるようにする)
+
+import frame_store
+import synthetic_scene
+
+
+def load_all(path):
+    return [(name, frame_store.load_frame(path, key)) for name, key in frame_store.list_frames(path)]
+
+
+class ContainerTest(unittest.TestCase):
+    """.npz / .jsonl ファイルから読み込んだフレームが、フレームごとのJSONと同じになる"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        synthetic_scene.build_scene(bone_count=5, group_size=10, frame_count=3)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def export(self, name, *args):
+        output_dir = os.path.join(self.temp_dir.name, name)
+        support.run_exporter(output_dir, *args)
+        return output_dir
+
+    def test_round_trip(self):
+        expected = load_all(self.export("json"))
+        self.assertEqual(len(expected), 3)
+        for output_format in ("npz", "jsonl"):
+            with self.subTest(output_format=output_format):
+                output_dir = self.export(output_format, "--output_format", output_format)
+                path = os.path.join(output_dir, f"animation_0001-0003.{output_format}")
+                self.assertEqual(load_all(path), expected)
+
+    def test_reexport(self):
+        output_dir = self.export("npz", "--output_format", "npz")
+        path = os.path.join(output_dir, "animation_0001-0003.npz")
+        self.assertEqual(len(frame_store.load_frame(path, 0)["bones"]), 5)
+
+        # 同じパスに書き直したファイルは開き直して読み込む
+        mtime = os.stat(path).st_mtime_ns
+        synthetic_scene.build_scene(bone_count=6, group_size=10, frame_count=3)
+        self.export("npz", "--output_format", "npz")
+        os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+        self.assertEqual(len(frame_store.load_frame(path, 0)["bones"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import support  # noqa: F401 (benchmarks のモジュールを読み込めるようにする)
+
+import json_trim
+import synthetic_frames
+
+
+class RerunTest(unittest.TestCase):
+    """入力フォルダに出力した後で再実行しても、出力したファイルを入力として扱わない"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = self.temp_dir.name
+        self.csv_path = os.path.join(self.input_dir, "bones.csv")
+        synthetic_frames.write_frames(self.input_dir, frame_count=2, bone_count=4, group_size=3)
+        synthetic_frames.write_bone_name_csv(self.csv_path, bone_count=4)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_trim(self, incremental):
+        tasks, skipped = json_trim.list_trim_tasks(self.input_dir, self.input_dir, "_trim", incremental,
+                                                   (self.csv_path,))
+        self.assertEqual(json_trim.trim_frames(tasks, self.csv_path), [])
+        return tasks, skipped
+
+    def json_files(self):
+        return sorted(name for name in os.listdir(self.input_dir) if name.endswith(".json"))
+
+    def test_rerun(self):
+        tasks, _ = self.run_trim(incremental=False)
+        self.assertEqual(len(tasks), 2)
+        tasks, _ = self.run_trim(incremental=False)
+        self.assertEqual([os.path.basename(path) for path, _, _ in tasks], ["0001.json", "0002.json"])
+        self.assertEqual(self.json_files(), ["0001.json", "0001_trim.json", "0002.json", "0002_trim.json"])
+
+    def test_incremental_rerun(self):
+        self.run_trim(incremental=True)
+        tasks, skipped = self.run_trim(incremental=True)
+        self.assertEqual(tasks, [])
+        self.assertEqual(skipped, 2)
+        self.assertEqual(self.json_files(), ["0001.json", "0001_trim.json", "0002.json", "0002_trim.json"])
+
+
+class RemoveKeysRecursiveTest(unittest.TestCase):
+    """除外するキーを入れ子の辞書とリストから削除し、数値や文字列はそのままにする"""
+
+    def test_nested(self):
+        data = {"a": 1, "b": [{"a": 2, "c": "a"}, ["a", 3]], "c": {"a": {"d": 4}}}
+        json_trim.remove_keys_recursive(data, frozenset({"a"}))
+        self.assertEqual(data, {"b": [{"c": "a"}, ["a", 3]], "c": {}})
+
+    def test_scalar(self):
+        for value in ("abc", 1, 1.5, None):
+            json_trim.remove_keys_recursive(value, frozenset({"a"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import json
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import support  # noqa: F401 (stub の bpy を読み込めるようにする)
+
+import bone_info_save_launcher as launcher
+import frame_store
+
+
+class SplitFramesTest(unittest.TestCase):
+    """フレーム範囲をフレーム数がほぼ同じ連続した区間に分割する"""
+
+    def test_uneven(self):
+        self.assertEqual(launcher.split_frames(1, 10, 1, 3), [(1, 3), (4, 6), (7, 10)])
+
+    def test_step(self):
+        self.assertEqual(launcher.split_frames(1, 10, 3, 2), [(1, 4), (7, 10)])
+        # 終了フレームが間隔に合わない場合は、最後に保存されるフレームで区間を終える
+        self.assertEqual(launcher.split_frames(1, 10, 4, 2), [(1, 1), (5, 9)])
+
+    def test_more_shards_than_frames(self):
+        self.assertEqual(launcher.split_frames(1, 3, 1, 8), [(1, 1), (2, 2), (3, 3)])
+        self.assertEqual(launcher.split_frames(5, 5, 1, 0), [(5, 5)])
+
+
+def make_shard(index, frame_start, frame_end, frame_step=1, result=None):
+    return {"index": index, "frame_start": frame_start, "frame_end": frame_end, "frame_step": frame_step,
+            "attempts": 1, "manifest": f"shard_{index:03d}.json", "log": f"shard_{index:03d}.log", "result": result}
+
+
+def make_manifest(frames, fps=24.0):
+    return {"fps": fps, "frames": [{"frame": frame, "file": f"{frame:04d}.json"} for frame in frames]}
+
+
+class ManifestTest(unittest.TestCase):
+    """区間ごとのマニフェストの確認とまとめ"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_shard_manifest(self, shard, manifest):
+        shard["manifest"] = os.path.join(self.output_dir, shard["manifest"])
+        with open(shard["manifest"], "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+    def test_load_shard_manifest(self):
+        shard = make_shard(0, 1, 7, 3)
+        self.assertIsNone(launcher.load_shard_manifest(dict(shard, manifest=os.path.join(self.output_dir, "none.json"))))
+
+        self.write_shard_manifest(shard, make_manifest([1, 4]))
+        self.assertIsNone(launcher.load_shard_manifest(shard))
+
+        self.write_shard_manifest(make_shard(0, 1, 7, 3), make_manifest([1, 4, 7]))
+        self.assertEqual(launcher.load_shard_manifest(shard)["frames"][-1]["frame"], 7)
+
+    def test_write_merged_manifest(self):
+        shards = [
+            make_shard(0, 1, 2, result=make_manifest([2, 1])),
+            make_shard(1, 3, 4),
+            make_shard(2, 5, 6, result=make_manifest([5, 6], fps=30.0)),
+        ]
+        launcher.write_merged_manifest(self.output_dir, shards, 1, 6, 1)
+        with open(os.path.join(self.output_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.assertEqual([entry["frame"] for entry in manifest["frames"]], [1, 2, 5, 6])
+        self.assertEqual(manifest["fps"], 30.0)
+        self.assertEqual((manifest["frame_start"], manifest["frame_end"], manifest["frame_step"]), (1, 6, 1))
+        self.assertEqual(manifest["failed_shards"], [{"frame_start": 3, "frame_end": 4, "log": "shard_001.log"}])
+        self.assertEqual(frame_store.read_fps(self.output_dir), 30.0)
+
+
+# blender の代わりに起動するスクリプト (stub のシーンで bone_info_save.py を実行する)
+# 最初の試行では frame_start が 4 の区間のフレームを1つおきにしか保存せず、マニフェストのフレームが足りない状態にする
+FAKE_BLENDER = """
+import os
+import runpy
+import sys
+
+sys.path[:0] = {paths!r}
+import synthetic_scene
+
+argv = sys.argv
+script_path = argv[argv.index("--python") + 1]
+script_args = argv[argv.index("--"):]
+frame_start = script_args[script_args.index("--frame_start") + 1]
+output_dir = script_args[script_args.index("--output_dir") + 1]
+flag_path = os.path.join(output_dir, "_shards", "retried_" + frame_start)
+if frame_start == "4" and not os.path.exists(flag_path):
+    open(flag_path, "w").close()
+    script_args[script_args.index("--frame_step") + 1] = "2"
+
+synthetic_scene.build_scene(bone_count=3, group_size=5, frame_count=10)
+sys.argv = [argv[0]] + script_args
+runpy.run_path(script_path, run_name="__main__")
+"""
+
+
+class RunShardsTest(unittest.TestCase):
+    """区間ごとに Blender (の代わりのスクリプト) を起動し、フレームが足りない区間を再実行する"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.fake_blender = os.path.join(self.temp_dir.name, "fake_blender.py")
+        with open(self.fake_blender, "w", encoding="utf-8") as f:
+            f.write(textwrap.dedent(FAKE_BLENDER).format(
+                paths=[support.ROOT_DIR, support.BENCHMARK_DIR, os.path.join(support.BENCHMARK_DIR, "stub")]))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_shards(self, output_format):
+        output_dir = os.path.join(self.temp_dir.name, output_format)
+        # blender の代わりに python を起動する (-b は無視され、blendファイルの位置のスクリプトが実行される)
+        failed = launcher.run_shards(self.fake_blender, output_dir, 1, 9, 1, 3, sys.executable, None, 1,
+                                     ["--output_format", output_format])
+        self.assertEqual(failed, [])
+        return output_dir
+
+    def test_retry_and_containers(self):
+        for output_format in ("json", "npz", "jsonl"):
+            with self.subTest(output_format=output_format):
+                output_dir = self.run_shards(output_format)
+                with open(os.path.join(output_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                self.assertEqual([entry["frame"] for entry in manifest["frames"]], list(range(1, 10)))
+                self.assertEqual(manifest["failed_shards"], [])
+                self.assertTrue(os.path.exists(os.path.join(output_dir, "_shards", "retried_4")))
+
+                # 区間ごとのコンテナはフォルダを指定すると全てのフレームをフレーム順に読み込める
+                frames = frame_store.list_frames(output_dir)
+                self.assertEqual([name for name, _ in frames], [f"{frame:04d}" for frame in range(1, 10)])
+                self.assertEqual(len(frame_store.load_frame(output_dir, frames[4][1])["bones"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()